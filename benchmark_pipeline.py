@@ -0,0 +1,280 @@
+import argparse
+import json
+import platform
+import resource
+import subprocess
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from gesture_preprocess import FramePreprocessor, hand_bbox
+from hand_tracking import RoiTracker, points_to_frame
+from landmark_classifier import landmarks_to_array
+from motion_gate import PERSON_SEEN_TIMEOUT, AdaptiveInterval, MotionGate
+
+
+# ------------------------------------------
+# 📌 단계별 시간 측정
+# ------------------------------------------
+class StageTimer:
+    def __init__(self):
+        self.samples = defaultdict(list)  # 단계 이름 → 초 단위 측정값
+
+    def time(self, stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        self.samples[stage].append(time.perf_counter() - start)
+        return result
+
+    def add(self, stage, seconds):
+        self.samples[stage].append(seconds)
+
+    def summary(self):
+        report = {}
+        for stage, values in self.samples.items():
+            ms = np.array(values) * 1000.0
+            report[stage] = {
+                "count": len(ms),
+                "mean_ms": round(float(ms.mean()), 4),
+                "p50_ms": round(float(np.percentile(ms, 50)), 4),
+                "p95_ms": round(float(np.percentile(ms, 95)), 4),
+                "p99_ms": round(float(np.percentile(ms, 99)), 4),
+            }
+        return report
+
+
+# ------------------------------------------
+# 📌 입력 프레임 (녹화 영상 또는 합성 프레임)
+# ------------------------------------------
+def video_frames(path, limit):
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while count < limit:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        yield frame
+        count += 1
+    cap.release()
+
+
+def synthetic_frames(width, height, limit, seed=0):
+    """노이즈 배경 위로 사각형이 움직이는 합성 프레임 (움직임 게이트도 동작하도록)."""
+    rng = np.random.default_rng(seed)
+    background = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(limit):
+        frame = background.copy()
+        x = (i * 7) % max(width - 80, 1)
+        frame[height // 3:height // 3 + 80, x:x + 80] = (40, 180, 220)
+        yield frame
+
+
+# ------------------------------------------
+# 📌 스텁 모델 (카메라/모델 없이 CI에서 실행)
+# ------------------------------------------
+class StubHands:
+    """프레임 중앙 근처에 손 하나가 있다고 가정하고 고정된 21개 랜드마크를 돌려줍니다."""
+
+    def __init__(self):
+        rng = np.random.default_rng(1)
+        points = 0.4 + 0.2 * rng.random((21, 3))
+        hand = SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in points])
+        handedness = SimpleNamespace(classification=[SimpleNamespace(score=0.95)])
+        self._result = SimpleNamespace(multi_hand_landmarks=[hand], multi_handedness=[handedness])
+
+    def process(self, img_rgb):
+        return self._result
+
+
+class StubClassifier:
+    name = "stub"
+    input_size = (128, 128)
+    input_dtype = np.float32
+    input_transform = (1.0 / 255.0, 0.0)
+
+    def predict_raw(self, batch):
+        logits = batch.reshape(len(batch), -1)[:, :4].astype(np.float32)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+
+class StubPersonDetector:
+    """YOLO 입력 크기(640)로 줄이는 비용만 흉내 냅니다."""
+
+    def detect(self, frame):
+        cv2.resize(frame, (640, 480))
+        return []
+
+
+def load_real_models(args):
+    import mediapipe as mp
+
+    from gesture_backends import load_backend
+
+    hands = mp.solutions.hands.Hands(
+        static_image_mode=False, max_num_hands=2, min_detection_confidence=0.7, model_complexity=0
+    )
+    classifier = load_backend(args.backend, args.model)
+    # 첫 호출의 그래프 추적/초기화 비용이 FPS에 섞이지 않도록 미리 한 번 실행합니다.
+    classifier.warmup(2)
+    hands.process(np.zeros((args.height, args.width, 3), dtype=np.uint8))
+    return hands, classifier
+
+
+def load_real_person_detector(args):
+    from person_detectors import load_detector
+
+    detector = load_detector(args.person_backend, args.person_model, args.person_input_size)
+    detector.warmup((args.width, args.height))
+    return detector
+
+
+# ------------------------------------------
+# 📌 파이프라인 (hand_gesture_thread / human_detect_buzzer 루프와 같은 단계)
+# ------------------------------------------
+def run_gesture(frames, hands, classifier, timer, max_hands=2, roi_tracking=True):
+    preprocessor = FramePreprocessor(classifier, max_batch=max_hands)
+    roi_tracker = RoiTracker()
+    rgb_buffer = None
+    frames = iter(frames)
+    while True:
+        start = time.perf_counter()
+        frame = next(frames, None)
+        if frame is None:
+            break
+        timer.add("capture", time.perf_counter() - start)
+
+        h, w, _ = frame.shape
+        roi = roi_tracker.predict_roi(w, h) if roi_tracking else None
+        if roi is None:
+            if rgb_buffer is None or rgb_buffer.shape != frame.shape:
+                rgb_buffer = np.empty_like(frame)
+            img_rgb = timer.time("color_convert", cv2.cvtColor, frame, cv2.COLOR_BGR2RGB, rgb_buffer)
+        else:
+            x1, y1, x2, y2 = roi
+            img_rgb = timer.time("color_convert", cv2.cvtColor, frame[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+        results = timer.time("mediapipe_full" if roi is None else "mediapipe_roi", hands.process, img_rgb)
+
+        count = 0
+        crop_start = time.perf_counter()
+        all_points = []
+        for hand_landmarks in results.multi_hand_landmarks or []:
+            points = points_to_frame(landmarks_to_array(hand_landmarks), roi, w, h)
+            all_points.append(points)
+            x_min, y_min, x_max, y_max = hand_bbox(points, w, h)
+            hand_img = frame[y_min:y_max, x_min:x_max]
+            if hand_img.size == 0:
+                continue
+            preprocessor.fill_crop(count, hand_img)
+            count += 1
+        if roi_tracking:
+            roi_tracker.update(all_points, roi, w, h)
+        if count:
+            timer.add("crop_resize", time.perf_counter() - crop_start)
+            timer.time("classify", classifier.predict_raw, preprocessor.batch_view(count))
+
+        timer.add("end_to_end", time.perf_counter() - start)
+
+
+def run_person(frames, detector, timer, gated):
+    motion_gate = MotionGate()
+    interval = AdaptiveInterval()
+    last_person_seen = -float("inf")
+    frames = iter(frames)
+    while True:
+        start = time.perf_counter()
+        frame = next(frames, None)
+        if frame is None:
+            break
+        timer.add("capture", time.perf_counter() - start)
+
+        if gated:
+            motion = timer.time("motion_gate", motion_gate.update, frame)
+            # 실행 중인 human_detect_buzzer.py와 같이, 최근에 사람을 봤으면 촘촘한 간격으로 추론합니다.
+            person_recently_seen = time.monotonic() - last_person_seen < PERSON_SEEN_TIMEOUT
+            run_yolo = interval.should_infer(motion, person_recently_seen)
+        else:
+            run_yolo = True
+        if run_yolo and timer.time("yolo", detector.detect, frame):
+            last_person_seen = time.monotonic()
+
+        timer.add("end_to_end", time.perf_counter() - start)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def frame_source(args):
+    if args.video:
+        return video_frames(args.video, args.frames)
+    return synthetic_frames(args.width, args.height, args.frames)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="녹화 영상/합성 프레임으로 비전 파이프라인 성능 측정")
+    parser.add_argument("--pipeline", choices=["gesture", "person", "all"], default="all")
+    parser.add_argument("--video", help="입력 영상 파일 (생략 시 합성 프레임)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--real", action="store_true", help="스텁 대신 실제 MediaPipe/분류기/YOLO 사용")
+    parser.add_argument("--backend", default="keras", help="--real 사용 시 제스처 분류 백엔드")
+    parser.add_argument("--model", default="hand_model.h5", help="--real 사용 시 제스처 모델 경로")
+    parser.add_argument("--person-backend", default="ultralytics", help="--real 사용 시 사람 감지 백엔드 (ultralytics / onnx)")
+    parser.add_argument("--person-model", default="yolov5n.pt", help="--real 사용 시 사람 감지 모델 경로")
+    parser.add_argument("--person-input-size", type=int, default=640, help="--real 사용 시 사람 감지 입력 크기")
+    parser.add_argument("--no-roi-tracking", action="store_true", help="제스처에서 ROI 추적 끄기 (매 프레임 전체 검출)")
+    parser.add_argument("--no-motion-gate", action="store_true", help="사람 감지에서 움직임 게이트 끄기")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "platform": platform.platform(),
+        "config": vars(args),
+        "pipelines": {},
+    }
+
+    pipelines = ["gesture", "person"] if args.pipeline == "all" else [args.pipeline]
+    for name in pipelines:
+        timer = StageTimer()
+        # 프레임워크 import, 모델 로드, 워밍업 시간은 따로 기록하고 FPS 측정에서는 뺍니다.
+        load_start = time.perf_counter()
+        if name == "gesture":
+            hands, classifier = load_real_models(args) if args.real else (StubHands(), StubClassifier())
+            load_seconds = time.perf_counter() - load_start
+            start = time.perf_counter()
+            run_gesture(frame_source(args), hands, classifier, timer, roi_tracking=not args.no_roi_tracking)
+        else:
+            detector = load_real_person_detector(args) if args.real else StubPersonDetector()
+            load_seconds = time.perf_counter() - load_start
+            start = time.perf_counter()
+            run_person(frame_source(args), detector, timer, gated=not args.no_motion_gate)
+        elapsed = time.perf_counter() - start
+
+        frames = len(timer.samples["end_to_end"])
+        results["pipelines"][name] = {
+            "frames": frames,
+            "fps": round(frames / elapsed, 2) if elapsed > 0 else None,
+            "load_seconds": round(load_seconds, 3),
+            "stages": timer.summary(),
+        }
+        e2e = results["pipelines"][name]["stages"].get("end_to_end", {})
+        print(f"📊 {name}: {results['pipelines'][name]['fps']} FPS, "
+              f"p50 {e2e.get('p50_ms')}ms / p95 {e2e.get('p95_ms')}ms / p99 {e2e.get('p99_ms')}ms")
+
+    # 프로세스 전체의 최대 RSS입니다. (--pipeline all이면 두 파이프라인 모델이 모두 포함되므로, 파이프라인별 값은 따로 실행해 측정)
+    # Linux에서 ru_maxrss 단위는 KB입니다.
+    results["process_peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"✅ 결과 저장: {args.output} (프로세스 전체 최대 RSS {results['process_peak_rss_mb']}MB)")
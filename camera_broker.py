@@ -0,0 +1,257 @@
+import argparse
+import os
+import signal
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# 브로커와 소비자가 공유하는 기본 링 버퍼 이름
+CAMERA_SHM_NAME = os.environ.get("CAMERA_SHM_NAME", "smarthome_camera")
+RING_SLOTS = 8
+
+# 헤더: [버전, 너비, 높이, 채널, 슬롯 수, 최신 seq]
+_HEADER_FIELDS = 6
+_VERSION = 1
+_SEQ = 5
+# 슬롯 헤더: [seq, 캡처 시각(float64 비트)]
+_SLOT_FIELDS = 2
+
+
+def _attach(name):
+    """소비자 쪽에서 공유 메모리에 붙습니다. 소비자가 종료되어도 메모리가 지워지지 않게 합니다."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python 3.12 이하
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _segment_inode(name):
+    """/dev/shm의 세그먼트 inode. (리눅스 외 환경이나 이미 지워진 경우 None)"""
+    try:
+        return os.stat(os.path.join("/dev/shm", name.lstrip("/"))).st_ino
+    except OSError:
+        return None
+
+
+# --- 공유 메모리 프레임 링 버퍼 ---
+class SharedFrameRing:
+    """한 프로세스(브로커)가 쓰고 여러 프로세스가 복사 없이 읽는 프레임 링 버퍼.
+
+    각 슬롯은 쓰기 중에 seq를 -1로 표시했다가 완료 후 seq를 기록하므로, 읽는 쪽은 슬롯 seq가
+    기대한 값인지로 덮어쓰기 여부를 확인합니다. read()가 돌려주는 뷰는 브로커가 RING_SLOTS - 1장을
+    더 쓰면 덮어써지므로, 오래 쓸 소비자는 복사한 뒤 is_valid(seq)로 복사 도중 덮어써지지 않았는지 확인해야 합니다.
+    """
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        # 브로커가 재시작하면 같은 이름으로 새 세그먼트를 만들므로, 붙을 때의 inode로 교체 여부를 확인합니다.
+        self.inode = _segment_inode(shm.name)
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        _, width, height, channels, slots, _ = header
+        self.header = header
+        self.shape = (int(height), int(width), int(channels))
+        self.slots = int(slots)
+
+        offset = header.nbytes
+        self.slot_headers = np.ndarray((self.slots, _SLOT_FIELDS), dtype=np.int64, buffer=shm.buf, offset=offset)
+        self.slot_times = self.slot_headers.view(np.float64)[:, 1]
+        offset += self.slot_headers.nbytes
+        self.frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+        if not owner:
+            self.frames.flags.writeable = False
+
+    @classmethod
+    def create(cls, name, shape, slots=RING_SLOTS):
+        height, width, channels = shape
+        size = 8 * (_HEADER_FIELDS + slots * _SLOT_FIELDS) + slots * height * width * channels
+        try:
+            # 이전 브로커가 비정상 종료하며 남긴 메모리는 지우고 새로 만듭니다.
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+        header[:] = (_VERSION, width, height, channels, slots, 0)
+        ring = cls(shm, owner=True)
+        ring.slot_headers[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, timeout=None):
+        """브로커가 링 버퍼를 만들고 헤더를 다 쓸 때까지 기다렸다가 붙습니다."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            try:
+                shm = _attach(name)
+            except FileNotFoundError:
+                shm = None
+            if shm is not None:
+                # 세그먼트 생성 직후 헤더를 쓰기 전이면 슬롯 수가 0이므로, 아직 준비되지 않은 것으로 봅니다.
+                header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=shm.buf)
+                ready = header[0] == _VERSION and header[4] > 0
+                del header
+                if ready:
+                    return cls(shm, owner=False)
+                shm.close()
+            if deadline is not None and time.time() > deadline:
+                raise FileNotFoundError(f"카메라 브로커 링 버퍼가 준비되지 않았습니다: {name}")
+            time.sleep(0.2)
+
+    @property
+    def latest_seq(self):
+        return int(self.header[_SEQ])
+
+    def write(self, frame, timestamp):
+        seq = self.latest_seq + 1
+        slot = seq % self.slots
+        self.slot_headers[slot, 0] = -1
+        self.frames[slot][...] = frame
+        self.slot_times[slot] = timestamp
+        self.slot_headers[slot, 0] = seq
+        self.header[_SEQ] = seq
+        return seq
+
+    def read(self, seq):
+        """seq 프레임의 (캡처 시각, 읽기 전용 뷰)를 반환합니다. 이미 덮어써졌으면 (None, None)."""
+        slot = seq % self.slots
+        if self.slot_headers[slot, 0] != seq:
+            return None, None
+        return float(self.slot_times[slot]), self.frames[slot]
+
+    def is_valid(self, seq):
+        return self.slot_headers[seq % self.slots, 0] == seq
+
+    def is_replaced(self):
+        """브로커가 재시작해 같은 이름의 세그먼트가 지워졌거나 새로 만들어졌으면 True."""
+        return self.inode is not None and _segment_inode(self.shm.name) != self.inode
+
+    def close(self):
+        # numpy 뷰가 버퍼를 잡고 있으면 close가 실패하므로 먼저 해제합니다.
+        del self.header, self.slot_headers, self.slot_times, self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# --- 소비자용 프레임 소스 ---
+class SharedFrameSource:
+    """LatestFrameGrabber와 같은 인터페이스로 브로커의 최신 프레임을 읽습니다.
+
+    반환하는 프레임은 공유 메모리에서 복사한 배열이라, 분석/그리기 도중 브로커가 슬롯을 덮어써도 안전합니다.
+    브로커가 재시작해 세그먼트가 지워졌거나 바뀌었을 때만 다시 붙습니다. (브로커가 멈췄지만 세그먼트가 남아 있으면
+    새 프레임이 없는 것으로 보고 시간 초과를 돌려주므로, 호출자의 무응답 종료 처리가 동작합니다.)
+    새 링의 seq는 0부터 다시 시작하므로, 호출자에게 돌려주는 seq는 이전 값에 이어지도록 보정합니다.
+    """
+
+    def __init__(self, name=CAMERA_SHM_NAME, poll_interval=0.002, attach_timeout=2.0):
+        self.name = name
+        self.poll_interval = poll_interval
+        self.attach_timeout = attach_timeout
+        self.ring = None
+        self._seq_offset = 0  # 호출자 seq = 링 seq + _seq_offset
+
+    def start(self):
+        print(f"🟡 카메라 브로커 연결 대기 중... ({self.name})")
+        self.ring = SharedFrameRing.attach(self.name)
+        print(f"✅ 카메라 브로커 연결 완료 {self.ring.shape}")
+        return self
+
+    def _reattach(self, last_seq):
+        if self.ring is not None:
+            print("🔄 카메라 브로커가 재시작되어 공유 메모리에 다시 연결합니다.")
+            self.ring.close()
+            self.ring = None
+        try:
+            self.ring = SharedFrameRing.attach(self.name, timeout=self.attach_timeout)
+        except FileNotFoundError:
+            return False
+        # 붙을 때 이미 있던 프레임은 건너뛰고, 그 이후 새로 쓰인 프레임만 last_seq 다음 번호로 돌려줍니다.
+        self._seq_offset = last_seq - self.ring.latest_seq
+        print(f"✅ 카메라 브로커 재연결 완료 {self.ring.shape}")
+        return True
+
+    def read_latest(self, last_seq=0, timeout=1.0):
+        deadline = time.time() + timeout
+        while True:
+            if (self.ring is None or self.ring.is_replaced()) and not self._reattach(last_seq):
+                if time.time() > deadline:
+                    return last_seq, None, None
+                continue
+            seq = self.ring.latest_seq
+            if seq + self._seq_offset > last_seq:
+                timestamp, view = self.ring.read(seq)
+                if view is not None:
+                    frame = view.copy()
+                    # 복사하는 동안 브로커가 이 슬롯을 덮어썼으면 버리고 다시 읽습니다.
+                    if self.ring.is_valid(seq):
+                        return seq + self._seq_offset, timestamp, frame
+                    continue
+            if time.time() > deadline:
+                return last_seq, None, None
+            time.sleep(self.poll_interval)
+
+    def stop(self):
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+
+# --- 브로커 프로세스 ---
+def run_broker(cap, name=CAMERA_SHM_NAME, slots=RING_SLOTS):
+    from camera_config import CaptureStats
+
+    stats = CaptureStats(cap, source="broker")
+    ret, frame = cap.read()
+    if not ret:
+        print("❌ 첫 프레임을 읽지 못했습니다.")
+        return
+    ring = SharedFrameRing.create(name, frame.shape, slots)
+    print(f"📷 카메라 브로커 시작: {name} {frame.shape}, 슬롯 {slots}개")
+
+    running = True
+
+    def handle_stop(signum, _frame):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    try:
+        while running:
+            ring.write(frame, time.time())
+            ret, frame = cap.read()
+            while not ret and running:
+                print("❌ 프레임 읽기 실패. 카메라 연결이 불안정할 수 있습니다.")
+                time.sleep(0.05)
+                ret, frame = cap.read()
+            stats.on_frame()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats.report()
+        ring.close()
+        cap.release()
+        print("카메라 브로커 종료.")
+
+
+if __name__ == "__main__":
+    from camera_config import open_camera
+
+    parser = argparse.ArgumentParser(description="카메라를 한 번만 열어 공유 메모리로 프레임을 배포합니다.")
+    parser.add_argument("--device", type=int, default=None, help="카메라 번호 (생략 시 0~2 자동 탐색)")
+    parser.add_argument("--name", default=CAMERA_SHM_NAME)
+    parser.add_argument("--slots", type=int, default=RING_SLOTS)
+    args = parser.parse_args()
+
+    cap = open_camera([args.device] if args.device is not None else range(3))
+    if cap is None:
+        print("❌ 카메라 열기 실패! 연결 상태를 확인하세요.")
+    else:
+        run_broker(cap, args.name, args.slots)
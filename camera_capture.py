@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+from collections import deque
+
+from camera_config import CaptureStats, open_camera
+
+# "direct": 이 프로세스가 카메라를 직접 엶 / "broker": camera_broker.py의 공유 메모리에서 읽음
+CAMERA_SOURCE = os.environ.get("CAMERA_SOURCE", "direct")
+
+
+def open_frame_source(indices=range(3)):
+    """CAMERA_SOURCE 설정에 따라 시작된 프레임 소스를 반환합니다. 카메라를 못 열면 None.
+
+    두 소스 모두 read_latest(last_seq, timeout) → (seq, 캡처 시각, frame)과 stop()을 제공합니다.
+    브로커 소스는 공유 메모리에서 복사한 프레임을 돌려주고, 브로커가 재시작하면 자동으로 다시 연결합니다.
+    """
+    if CAMERA_SOURCE == "broker":
+        from camera_broker import SharedFrameSource
+
+        return SharedFrameSource().start()
+
+    cap = open_camera(indices)
+    if cap is None:
+        return None
+    return LatestFrameGrabber(cap).start()
+
+
+# --- 최신 프레임 캡처 스레드 ---
+class LatestFrameGrabber:
+    """카메라를 별도 스레드에서 계속 읽고, 가장 최근 프레임만 작은 링 버퍼에 보관합니다.
+
+    추론이 느려도 V4L2 버퍼에 오래된 프레임이 쌓이지 않도록 캡처와 분석을 분리합니다.
+    소비자는 read_latest()로 항상 가장 최신 프레임을 가져가며, 그 사이에 들어온
+    프레임은 자동으로 버려집니다.
+    """
+
+    def __init__(self, cap, buffer_size=2):
+        self.cap = cap
+        self._frames = deque(maxlen=buffer_size)  # (seq, 캡처 시각, frame)
+        self._cond = threading.Condition()
+        self._seq = 0
+        self._running = False
+        self._thread = None
+        self.stats = CaptureStats(cap, source="direct")
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    def _capture_loop(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            if not ret:
+                print("❌ 프레임 읽기 실패. 카메라 연결이 불안정할 수 있습니다.")
+                time.sleep(0.05)
+                continue
+
+            self.stats.on_frame()
+            with self._cond:
+                self._seq += 1
+                self._frames.append((self._seq, time.time(), frame))
+                self._cond.notify_all()
+
+    def read_latest(self, last_seq=0, timeout=1.0):
+        """last_seq 이후의 가장 최신 프레임을 반환합니다. 시간 초과 시 (last_seq, None, None)."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > last_seq or not self._running, timeout):
+                return last_seq, None, None
+            if not self._frames:
+                return last_seq, None, None
+            return self._frames[-1]
+
+    def stop(self):
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        self.stats.report()
+        self.cap.release()
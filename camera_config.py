@@ -0,0 +1,209 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+
+import cv2
+import numpy as np
+
+import metrics
+
+# --- 캡처 설정 (환경 변수로 변경) ---
+# MJPG는 USB 대역폭을 적게 써서 640x480 이상에서도 30fps를 유지하기 쉽고, YUYV는 디코딩이 없어 CPU를 덜 씁니다.
+CAMERA_WIDTH = int(os.environ.get("CAMERA_WIDTH", "640"))
+CAMERA_HEIGHT = int(os.environ.get("CAMERA_HEIGHT", "480"))
+CAMERA_FPS = int(os.environ.get("CAMERA_FPS", "30"))
+CAMERA_FOURCC = os.environ.get("CAMERA_FOURCC", "MJPG")  # "MJPG" / "YUYV" / "" (드라이버 기본값)
+# 드라이버 버퍼 수. 1이면 항상 가장 최근에 찍힌 프레임을 받습니다. (드라이버가 지원하지 않으면 무시됨)
+CAMERA_BUFFER_SIZE = int(os.environ.get("CAMERA_BUFFER_SIZE", "1"))
+# 마지막으로 열린 카메라 번호를 기억해 다음 시작 때 먼저 시도합니다.
+CAMERA_CACHE_PATH = os.environ.get(
+    "CAMERA_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".camera_cache.json")
+)
+# 리눅스에서는 V4L2를 직접 사용해 GStreamer 등 다른 백엔드를 거치는 탐색 시간을 줄입니다.
+CAPTURE_API = cv2.CAP_V4L2 if sys.platform.startswith("linux") else cv2.CAP_ANY
+
+FRAME_INTERVAL = metrics.histogram(
+    "camera_frame_interval_seconds", "연속한 두 프레임의 캡처 간격 (1/실측 FPS)", ["source"],
+    buckets=(0.01, 0.02, 0.03, 0.035, 0.04, 0.05, 0.067, 0.1, 0.2, 0.5),
+)
+DRIVER_LATENCY = metrics.histogram(
+    "camera_driver_latency_seconds", "드라이버가 프레임에 기록한 시각부터 앱이 받을 때까지의 지연", ["source"]
+)
+
+
+@dataclass
+class CameraSettings:
+    width: int = CAMERA_WIDTH
+    height: int = CAMERA_HEIGHT
+    fps: int = CAMERA_FPS
+    fourcc: str = CAMERA_FOURCC
+    buffer_size: int = CAMERA_BUFFER_SIZE
+
+
+def fourcc_to_str(value):
+    value = int(value)
+    return "".join(chr((value >> (8 * i)) & 0xFF) for i in range(4)).strip("\0")
+
+
+def configure_capture(cap, settings):
+    """설정을 카메라에 적용하고, 드라이버가 실제로 받아들인 값을 dict로 반환합니다."""
+    # V4L2는 픽셀 형식을 해상도보다 먼저 바꿔야 해당 형식에서 가능한 해상도/FPS가 선택됩니다.
+    if settings.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*settings.fourcc))
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings.width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.height)
+    cap.set(cv2.CAP_PROP_FPS, settings.fps)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, settings.buffer_size)
+
+    applied = {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": round(cap.get(cv2.CAP_PROP_FPS), 2),
+        "fourcc": fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC)),
+        "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+    requested = asdict(settings)
+    mismatched = [
+        f"{key} {requested[key]}→{applied[key]}"
+        for key in requested
+        if requested[key] and (
+            applied[key] != requested[key] if key == "fourcc" else abs(applied[key] - requested[key]) > 0.5
+        )
+    ]
+    print(
+        f"📷 카메라 설정: {applied['width']}x{applied['height']} {applied['fourcc'] or '?'} "
+        f"{applied['fps']}fps, 버퍼 {applied['buffer_size']}"
+        + (f" (요청과 다름: {', '.join(mismatched)})" if mismatched else "")
+    )
+    return applied
+
+
+# --- 장치 번호 캐시 ---
+# 호출하는 스크립트마다 탐색하는 번호 목록이 다르므로(예: 제스처 0~2, 사람 감지 2), 목록별로 따로 기억합니다.
+def _cache_key(indices):
+    return ",".join(str(i) for i in indices)
+
+
+def _load_cache():
+    try:
+        with open(CAMERA_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def load_cached_device(indices):
+    entry = _load_cache().get(_cache_key(indices))
+    return entry.get("device") if isinstance(entry, dict) else None
+
+
+def save_cached_device(indices, device, applied):
+    cache = _load_cache()
+    cache[_cache_key(indices)] = {"device": device, "applied": applied, "saved_at": time.time()}
+    try:
+        with open(CAMERA_CACHE_PATH, "w") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print("⚠️ 카메라 캐시 저장 실패:", e)
+
+
+def open_camera(indices=range(3), settings=None):
+    """주어진 번호를 차례로 열어 설정을 적용한 카메라를 반환합니다. 실패하면 None.
+
+    여러 번호를 탐색할 때는 같은 목록으로 지난번에 열린 번호를 먼저 시도하고, 새로 찾은 번호를 기억합니다.
+    """
+    settings = settings or CameraSettings()
+    indices = list(indices)
+    probe_order = list(indices)
+    cached = load_cached_device(indices) if len(indices) > 1 else None
+    if cached in probe_order:
+        probe_order.remove(cached)
+        probe_order.insert(0, cached)
+
+    for i in probe_order:
+        start = time.perf_counter()
+        cap = cv2.VideoCapture(i, CAPTURE_API)
+        if cap.isOpened():
+            applied = configure_capture(cap, settings)
+            source = "캐시" if i == cached else "탐색"
+            print(f"✅ 카메라 {i} 사용 가능 ({source}, {(time.perf_counter() - start) * 1000:.0f}ms)")
+            if len(indices) > 1 and i != cached:
+                save_cached_device(indices, i, applied)
+            return cap
+        cap.release()
+    return None
+
+
+# --- 캡처 FPS/지연 측정 ---
+class CaptureStats:
+    """캡처 스레드에서 프레임마다 on_frame()을 호출하면 실측 FPS와 드라이버 → 앱 지연을 집계합니다.
+
+    V4L2는 프레임 버퍼에 CLOCK_MONOTONIC 시각을 기록하고 OpenCV가 CAP_PROP_POS_MSEC로 돌려주므로,
+    time.monotonic()과의 차이가 드라이버 버퍼에서 기다린 시간(버퍼 깊이만큼 늘어남)을 포함한 지연이 됩니다.
+    """
+
+    def __init__(self, cap, source="direct", report_after=150, window=300):
+        self.cap = cap
+        self.source = source
+        self.report_after = report_after
+        self.frames = 0
+        self._last = None
+        self._intervals = deque(maxlen=window)
+        self._latencies = deque(maxlen=window)
+
+    def on_frame(self):
+        now = time.monotonic()
+        self.frames += 1
+        if self._last is not None:
+            interval = now - self._last
+            self._intervals.append(interval)
+            FRAME_INTERVAL.observe(interval, source=self.source)
+        self._last = now
+
+        driver_ts = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        latency = now - driver_ts
+        if 0.0 <= latency < 5.0:  # 드라이버가 monotonic 시각을 주지 않는 경우(0 또는 다른 기준)는 제외
+            self._latencies.append(latency)
+            DRIVER_LATENCY.observe(latency, source=self.source)
+
+        if self.frames == self.report_after:
+            self.report()
+
+    @property
+    def fps(self):
+        if not self._intervals:
+            return 0.0
+        return 1.0 / (sum(self._intervals) / len(self._intervals))
+
+    def report(self):
+        text = f"📈 캡처 실측 {self.fps:.1f}fps"
+        if self._latencies:
+            p50, p95 = np.percentile(self._latencies, [50, 95]) * 1000
+            text += f", 드라이버→앱 지연 p50 {p50:.1f}ms / p95 {p95:.1f}ms"
+        print(text + f" ({self.source}, 최근 {len(self._intervals) + 1}프레임)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="카메라 설정별 실측 FPS/지연 비교")
+    parser.add_argument("--device", type=int, default=None, help="카메라 번호 (생략 시 캐시 → 0~2 탐색)")
+    parser.add_argument("--fourcc", nargs="+", default=["MJPG", "YUYV"])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for fourcc in args.fourcc:
+        settings = CameraSettings(fourcc=fourcc)
+        cap = open_camera([args.device] if args.device is not None else range(3), settings)
+        if cap is None:
+            print("❌ 카메라 열기 실패! 연결 상태를 확인하세요.")
+            break
+        stats = CaptureStats(cap, source=fourcc, report_after=0)
+        deadline = time.monotonic() + args.seconds
+        while time.monotonic() < deadline:
+            if cap.read()[0]:
+                stats.on_frame()
+        stats.report()
+        cap.release()
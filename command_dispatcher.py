@@ -0,0 +1,148 @@
+import os
+import queue
+import threading
+import time
+import uuid
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+# --- 기본 전송 대상 (환경 변수로 변경 가능) ---
+GPIO_URL = os.environ.get("GPIO_URL", "http://localhost:5000/control")
+SPEAKER_URL = os.environ.get("SPEAKER_URL", "http://10.10.15.167:8000/notify")
+# 명령 전달 방식: "http"(대상마다 HTTP POST) 또는 "bus"(같은 장비의 이벤트 버스에 한 번 발행)
+COMMAND_TRANSPORT = os.environ.get("COMMAND_TRANSPORT", "http")
+
+# 대상 이름별 로그 표시 (아이콘, 이름)
+TARGET_LABELS = {
+    "gpio": ("📡", "GPIO 서버"),
+    "speaker": ("🔊", "스피커"),
+}
+
+QUEUE_DELAY = metrics.histogram("command_queue_delay_seconds", "명령이 전송 큐에서 대기한 시간", ["target"])
+SEND_LATENCY = metrics.histogram("command_send_seconds", "대상 서버 HTTP 요청 왕복 시간", ["target"])
+SEND_FAILURES = metrics.counter("command_send_failures_total", "재시도 후에도 실패한 전송 수", ["target"])
+QUEUE_DROPS = metrics.counter("command_queue_drops_total", "큐가 가득 차 버린 명령 수", ["target"])
+
+
+# --- 비동기 명령 전송기 ---
+class CommandDispatcher:
+    """명령을 여러 대상(GPIO 서버, 스피커 서버)에 비동기로 전송합니다.
+
+    대상마다 크기가 제한된 큐와 전용 워커 스레드를 두고, 워커는 keep-alive 세션으로
+    연결을 재사용합니다. 요청에는 타임아웃과 지수 백오프 재시도가 적용되며,
+    한 대상이 느리거나 죽어 있어도 다른 대상이나 호출한 프레임 루프는 막히지 않습니다.
+    """
+
+    def __init__(self, targets, workers_per_target=1, queue_size=16,
+                 timeout=(0.5, 2.0), retries=2, backoff=0.2):
+        self.targets = dict(targets)  # 이름 → URL
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.workers_per_target = workers_per_target
+        self._queues = {name: queue.Queue(maxsize=queue_size) for name in self.targets}
+        self._threads = []
+        for name in self.targets:
+            for _ in range(workers_per_target):
+                t = threading.Thread(target=self._worker, args=(name,), daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def dispatch(self, cmd, targets=None, origin_ts=None, cmd_id=None):
+        """cmd를 대상들의 큐에 넣고 바로 반환합니다. 큐가 가득 차면 가장 오래된 명령을 버립니다.
+
+        요청 본문에는 명령 ID(cmd_id, 기본값은 새로 생성)와 발생 시각(ts, 기본값은 지금)이 함께 실려,
+        수신 서버에서 제스처 → 릴레이까지의 전체 지연을 추적할 수 있습니다. 명령 ID를 반환합니다.
+        """
+        payload = {
+            "cmd": cmd,
+            "cmd_id": cmd_id or uuid.uuid4().hex[:12],
+            "ts": origin_ts if origin_ts is not None else time.time(),
+        }
+        enqueued_at = time.perf_counter()
+        for name in targets or self.targets:
+            q = self._queues[name]
+            while True:
+                try:
+                    q.put_nowait((payload, enqueued_at))
+                    break
+                except queue.Full:
+                    try:
+                        dropped, _ = q.get_nowait()
+                        QUEUE_DROPS.inc(target=name)
+                        print(f"⚠️ {name} 큐가 가득 차 오래된 명령을 버립니다: {dropped['cmd']}")
+                    except queue.Empty:
+                        pass
+        return payload["cmd_id"]
+
+    def _worker(self, name):
+        url = self.targets[name]
+        icon, label = TARGET_LABELS.get(name, ("📨", name))
+        session = requests.Session()
+        session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        q = self._queues[name]
+
+        while True:
+            item = q.get()
+            if item is None:
+                break
+            payload, enqueued_at = item
+            cmd = payload["cmd"]
+            QUEUE_DELAY.observe(time.perf_counter() - enqueued_at, target=name)
+            for attempt in range(self.retries + 1):
+                try:
+                    with SEND_LATENCY.time(target=name):
+                        res = session.post(url, json=payload, timeout=self.timeout)
+                    if res.status_code >= 500:
+                        raise requests.HTTPError(f"HTTP {res.status_code}")
+                    print(f"{icon} {label} 응답({cmd}, {payload['cmd_id']}):", res.text.strip())
+                    break
+                except requests.RequestException as e:
+                    if attempt == self.retries:
+                        SEND_FAILURES.inc(target=name)
+                        print(f"❌ {label} 전송 실패 ({cmd}, {payload['cmd_id']}):", e)
+                    else:
+                        time.sleep(self.backoff * (2 ** attempt))
+        session.close()
+
+    def close(self, timeout=1.0):
+        """워커에 종료 신호를 보내고, 남은 명령을 최대 timeout초 동안 전송하도록 기다립니다."""
+        for q in self._queues.values():
+            for _ in range(self.workers_per_target):
+                try:
+                    q.put(None, timeout=timeout)
+                except queue.Full:
+                    pass
+        deadline = time.time() + timeout
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.time()))
+
+
+# --- 이벤트 버스 전송기 ---
+class BusDispatcher:
+    """CommandDispatcher와 같은 인터페이스로 로컬 이벤트 버스에 한 번만 발행합니다.
+
+    누가 받을지는 구독자가 정합니다. (gpio_server는 명령을, 브리지는 원격 스피커로 전달)
+    """
+
+    def __init__(self, source=""):
+        from event_bus import EventBus
+
+        self.bus = EventBus(source=source)
+
+    def dispatch(self, cmd, targets=None, origin_ts=None, cmd_id=None):
+        return self.bus.publish(cmd, origin_ts=origin_ts, cmd_id=cmd_id)
+
+    def close(self, timeout=1.0):
+        self.bus.close()
+
+
+def open_dispatcher(targets, source=""):
+    """COMMAND_TRANSPORT에 따라 HTTP 전송기 또는 버스 전송기를 만듭니다."""
+    if COMMAND_TRANSPORT == "bus":
+        print(f"📮 명령 전달: 로컬 이벤트 버스 ({source or '발행자'})")
+        return BusDispatcher(source)
+    return CommandDispatcher(targets)
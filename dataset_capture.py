@@ -0,0 +1,224 @@
+import argparse
+import glob
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+import metrics
+
+# --- 캡처 설정 ---
+CROP_SIZE = int(os.environ.get("GESTURE_CAPTURE_CROP_SIZE", "128"))  # 저장할 손 이미지 크기 (train_gesture 기본 입력과 같음)
+SHARD_SIZE = int(os.environ.get("GESTURE_CAPTURE_SHARD_SIZE", "512"))  # 샤드 파일 하나에 담을 샘플 수
+SAMPLE_EVERY = int(os.environ.get("GESTURE_CAPTURE_EVERY", "3"))  # 일반 샘플은 손마다 N프레임에 하나만 저장 (어려운 샘플은 항상 저장)
+LOW_CONFIDENCE = 0.6  # 최고 확률이 이보다 낮으면 어려운 샘플
+FLICKER_WINDOW = 8  # 최근 이 프레임 수 안에서
+FLICKER_CHANGES = 2  # 예측이 이만큼 이상 바뀌면 어려운 샘플
+FLUSH_INTERVAL = 60.0  # 샤드가 다 차지 않아도 이 시간(초)이 지나면 저장 (비정상 종료 시 손실 제한)
+
+# 어려운 샘플(hard negative) 사유 비트
+LOW_CONFIDENCE_FLAG = 1
+FLICKER_FLAG = 2
+MISMATCH_FLAG = 4  # 캡처 라벨을 지정했는데 예측이 다름
+FLAG_NAMES = {LOW_CONFIDENCE_FLAG: "low_confidence", FLICKER_FLAG: "flicker", MISMATCH_FLAG: "mismatch"}
+
+CAPTURED = metrics.counter("gesture_capture_samples_total", "저장 대기열에 넣은 샘플 수", ["kind"])
+CAPTURE_DROPS = metrics.counter("gesture_capture_drops_total", "저장 대기열이 가득 차 버린 샘플 수")
+SHARD_WRITE_LATENCY = metrics.histogram(
+    "gesture_capture_shard_write_seconds", "샤드 파일 하나를 압축해 쓰는 데 걸린 시간",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+# --- 실시간 파이프라인에서 학습 데이터 수집 ---
+class DatasetRecorder:
+    """손 이미지, 랜드마크, 예측 확률을 모아 압축 샤드(npz)로 저장합니다.
+
+    프레임 루프에서는 손 영역을 복사해 대기열에 넣기만 하고, 리사이즈/압축/디스크 쓰기는 백그라운드 스레드가 합니다.
+    대기열이 가득 차면(디스크가 느리면) 기다리지 않고 샘플을 버립니다.
+
+    확신이 낮거나(LOW_CONFIDENCE) 최근 예측이 자주 바뀐(FLICKER_*) 샘플, 그리고 label이 주어졌을 때 예측이 틀린 샘플은
+    어려운 샘플로 표시하고 SAMPLE_EVERY와 관계없이 모두 저장합니다.
+    label: 지금 보여 주는 제스처 이름 (수집 세션에서 지정). 없으면 -1로 저장되고, 학습 시 예측을 가짜 라벨로 쓸 수 있습니다.
+    """
+
+    def __init__(self, out_dir, class_names, label=None, crop_size=CROP_SIZE, shard_size=SHARD_SIZE,
+                 sample_every=SAMPLE_EVERY, queue_size=256):
+        self.out_dir = out_dir
+        self.class_names = list(class_names)
+        if label is not None and label not in self.class_names:
+            raise ValueError(f"알 수 없는 캡처 라벨: {label} (사용 가능: {', '.join(self.class_names)})")
+        self.label = -1 if label is None else self.class_names.index(label)
+        self.crop_size = crop_size
+        self.shard_size = shard_size
+        self.sample_every = max(1, sample_every)
+        os.makedirs(out_dir, exist_ok=True)
+
+        self._history = {}  # 손 ID → 최근 예측 클래스
+        self._counts = {}  # 손 ID → 본 프레임 수
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._prefix = f"capture_{time.strftime('%Y%m%d_%H%M%S')}_{os.getpid()}"
+        self.shards_written = 0
+        self.samples_written = 0
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def hard_flags(self, hand_id, probs):
+        """이 손의 예측 기록을 갱신하고 어려운 샘플 사유 비트를 반환합니다. (0이면 일반 샘플)"""
+        pred = int(np.argmax(probs))
+        history = self._history.setdefault(hand_id, deque(maxlen=FLICKER_WINDOW))
+        history.append(pred)
+        flags = 0
+        if probs[pred] < LOW_CONFIDENCE:
+            flags |= LOW_CONFIDENCE_FLAG
+        if sum(a != b for a, b in zip(history, list(history)[1:])) >= FLICKER_CHANGES:
+            flags |= FLICKER_FLAG
+        if self.label >= 0 and pred != self.label:
+            flags |= MISMATCH_FLAG
+        return flags
+
+    def add(self, hand_id, frame, box, points, probs, timestamp):
+        """손 하나를 기록 대상으로 넘깁니다. 저장할 샘플이면 손 영역을 복사해 대기열에 넣습니다."""
+        probs = np.asarray(probs, dtype=np.float32)
+        flags = self.hard_flags(hand_id, probs)
+        count = self._counts[hand_id] = self._counts.get(hand_id, 0) + 1
+        if not flags and count % self.sample_every:
+            return
+        x1, y1, x2, y2 = box
+        crop = frame[y1:y2, x1:x2]
+        if crop.size == 0:
+            return
+        try:
+            # 프레임 버퍼(공유 메모리일 수 있음)는 곧 덮어써지므로 손 영역만 복사해 넘깁니다.
+            self._queue.put_nowait((crop.copy(), np.array(points[:, :3], dtype=np.float32), probs, flags, hand_id, timestamp))
+        except queue.Full:
+            CAPTURE_DROPS.inc()
+            return
+        CAPTURED.inc(kind="hard_negative" if flags else "normal")
+
+    def prune(self, active_ids):
+        """추적이 끝난 손의 기록을 지웁니다."""
+        for hand_id in list(self._history):
+            if hand_id not in active_ids:
+                del self._history[hand_id]
+                self._counts.pop(hand_id, None)
+
+    def _writer_loop(self):
+        samples = []
+        started = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=1.0)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                break
+            if item:
+                crop, points, probs, flags, hand_id, timestamp = item
+                # 학습 입력과 같은 RGB 정사각형으로 줄여 저장합니다.
+                image = cv2.cvtColor(
+                    cv2.resize(crop, (self.crop_size, self.crop_size), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB
+                )
+                if not samples:
+                    started = time.monotonic()
+                samples.append((image, points, probs, flags, hand_id, timestamp))
+            if len(samples) >= self.shard_size or (samples and time.monotonic() - started >= FLUSH_INTERVAL):
+                self._write_shard(samples)
+                samples = []
+        if samples:
+            self._write_shard(samples)
+
+    def _write_shard(self, samples):
+        start = time.perf_counter()
+        images, points, probs, flags, hand_ids, timestamps = zip(*samples)
+        path = os.path.join(self.out_dir, f"{self._prefix}_{self.shards_written:04d}.npz")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                images=np.stack(images),
+                landmarks=np.stack(points),
+                probs=np.stack(probs),
+                flags=np.array(flags, dtype=np.uint8),
+                labels=np.full(len(samples), self.label, dtype=np.int16),
+                hand_ids=np.array(hand_ids, dtype=np.int32),
+                timestamps=np.array(timestamps, dtype=np.float64),
+                class_names=np.array(self.class_names),
+            )
+        # 다 쓴 파일만 .npz 이름으로 바꿔, 학습 쪽이 쓰는 중인 샤드를 읽지 않게 합니다.
+        os.replace(tmp_path, path)
+        SHARD_WRITE_LATENCY.observe(time.perf_counter() - start)
+        self.shards_written += 1
+        self.samples_written += len(samples)
+        hard = sum(1 for flag in flags if flag)
+        print(f"💾 캡처 샤드 저장: {os.path.basename(path)} ({len(samples)}개, 어려운 샘플 {hard}개)")
+
+    def close(self):
+        """남은 샘플을 저장하고 쓰기 스레드를 종료합니다."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+# --- 샤드 읽기 ---
+def list_shards(capture_dir):
+    return sorted(glob.glob(os.path.join(capture_dir, "*.npz")))
+
+
+def load_shard(path):
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def summarize(capture_dir):
+    """캡처 디렉터리의 샘플 수를 예측/라벨/어려운 샘플 사유별로 셉니다."""
+    summary = {"shards": 0, "samples": 0, "hard_negatives": 0, "by_prediction": {}, "by_label": {}, "by_flag": {}}
+    for path in list_shards(capture_dir):
+        shard = load_shard(path)
+        names = [str(c) for c in shard["class_names"]]
+        summary["shards"] += 1
+        summary["samples"] += len(shard["flags"])
+        summary["hard_negatives"] += int((shard["flags"] > 0).sum())
+        for pred in shard["probs"].argmax(axis=1):
+            summary["by_prediction"][names[pred]] = summary["by_prediction"].get(names[pred], 0) + 1
+        for label in shard["labels"]:
+            key = names[label] if label >= 0 else "unlabeled"
+            summary["by_label"][key] = summary["by_label"].get(key, 0) + 1
+        for bit, name in FLAG_NAMES.items():
+            summary["by_flag"][name] = summary["by_flag"].get(name, 0) + int((shard["flags"] & bit > 0).sum())
+    return summary
+
+
+def export_hard_negatives(capture_dir, out_dir):
+    """어려운 샘플을 <out_dir>/<예측 클래스>/ 아래 JPEG로 내보냅니다. (직접 보고 train_set에 라벨별로 옮길 때)"""
+    count = 0
+    for path in list_shards(capture_dir):
+        shard = load_shard(path)
+        names = [str(c) for c in shard["class_names"]]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        for i in np.flatnonzero(shard["flags"]):
+            pred = names[int(shard["probs"][i].argmax())]
+            os.makedirs(os.path.join(out_dir, pred), exist_ok=True)
+            cv2.imwrite(
+                os.path.join(out_dir, pred, f"{stem}_{i:04d}.jpg"), cv2.cvtColor(shard["images"][i], cv2.COLOR_RGB2BGR)
+            )
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="제스처 캡처 샤드 요약 / 어려운 샘플 내보내기")
+    parser.add_argument("capture_dir")
+    parser.add_argument("--export-hard-negatives", metavar="DIR", help="어려운 샘플을 JPEG로 내보낼 폴더")
+    args = parser.parse_args()
+
+    summary = summarize(args.capture_dir)
+    print(f"📦 샤드 {summary['shards']}개, 샘플 {summary['samples']}개 (어려운 샘플 {summary['hard_negatives']}개)")
+    for key in ("by_prediction", "by_label", "by_flag"):
+        print(f"  {key}: " + ", ".join(f"{name} {count}" for name, count in sorted(summary[key].items())))
+    if args.export_hard_negatives:
+        count = export_hard_negatives(args.capture_dir, args.export_hard_negatives)
+        print(f"✅ 어려운 샘플 {count}개 내보냄: {args.export_hard_negatives}")
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import metrics
+
+ACTUATION_LATENCY = metrics.histogram("gpio_actuation_seconds", "GPIO/PWM 쓰기에 걸린 시간", ["cmd"])
+COMMANDS = metrics.counter("gpio_commands_total", "처리한 제어 명령 수", ["cmd"])
+REDUNDANT = metrics.counter("gpio_redundant_commands_total", "이미 같은 상태라 쓰기를 생략한 명령 수", ["device"])
+COALESCED = metrics.counter("gpio_coalesced_commands_total", "반영 전에 더 새 명령으로 대체된 명령 수", ["device"])
+END_TO_END = metrics.histogram(
+    "command_end_to_end_seconds", "명령 발생(제스처 확정 등) 시각부터 GPIO 반영까지의 지연", ["cmd"]
+)
+
+
+# --- 기기 상태 엔진 ---
+class DeviceStateEngine:
+    """기기별 현재 상태를 기억하고, 명령을 기기별 최신 값 하나로 합쳐 전용 스레드에서 순서대로 반영합니다.
+
+    - submit()은 바로 반환합니다. 반영 전에 같은 기기에 새 명령이 오면 이전 명령은 버려집니다(latest-wins).
+    - 이미 원하는 상태면 하드웨어 쓰기를 생략합니다.
+    - 하드웨어 쓰기는 항상 한 스레드에서만 일어나므로 요청 스레드들끼리 GPIO를 두고 경쟁하지 않습니다.
+
+    commands: 명령 이름 → (기기 이름, 상태), actuators: 기기 이름 → 상태를 하드웨어에 쓰는 함수,
+    initial: 기기 이름 → 시작 시 하드웨어에 설정해 둔 상태.
+    """
+
+    def __init__(self, commands, actuators, initial):
+        self.commands = dict(commands)
+        self._actuators = dict(actuators)
+        self._state = dict(initial)
+        self._updated_at = {device: time.time() for device in self._state}
+        self._pending = {}  # 기기 → (상태, 순번, 명령, 메타데이터)
+        self._seq = 0
+        self._applied_seq = {device: 0 for device in self._state}
+        self._cond = threading.Condition()
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, cmd, meta=None):
+        """명령을 접수하고 (기기, 순번)을 반환합니다. 알 수 없는 명령이면 KeyError."""
+        device, state = self.commands[cmd]
+        with self._cond:
+            self._seq += 1
+            if device in self._pending:
+                COALESCED.inc(device=device)
+            self._pending[device] = (state, self._seq, cmd, meta or {})
+            self._cond.notify_all()
+            return device, self._seq
+
+    def wait(self, device, seq, timeout=1.0):
+        """순번 seq 이상의 명령이 device에 반영될 때까지 기다립니다. 반영되면 True."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._applied_seq[device] < seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def snapshot(self):
+        with self._cond:
+            return {
+                device: {"state": state, "updated_at": self._updated_at[device]}
+                for device, state in self._state.items()
+            }
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                batch, self._pending = self._pending, {}
+
+            for device, (state, seq, cmd, meta) in batch.items():
+                changed = self._apply(device, state, cmd, meta)
+                with self._cond:
+                    if changed:
+                        self._state[device] = state
+                        self._updated_at[device] = time.time()
+                    # 실패해도 순번은 넘깁니다. (기다리는 요청이 시간 초과까지 막히지 않도록)
+                    self._applied_seq[device] = seq
+                    self._cond.notify_all()
+
+    def _apply(self, device, state, cmd, meta):
+        """하드웨어에 반영하고, 상태가 바뀌었으면 True를 반환합니다."""
+        COMMANDS.inc(cmd=cmd)
+        if state == self._state[device]:
+            REDUNDANT.inc(device=device)
+            return False
+        start = time.perf_counter()
+        try:
+            self._actuators[device](state)
+        except Exception as e:
+            print(f"❌ {device} 반영 실패 ({cmd}):", e)
+            return False
+        ACTUATION_LATENCY.observe(time.perf_counter() - start, cmd=cmd)
+        # 명령에 발생 시각(ts)이 있으면 제스처 → 릴레이 전체 지연을 기록합니다.
+        # (다른 장비에서 온 명령은 두 장비의 시계가 맞아야 의미가 있습니다.)
+        if "ts" in meta:
+            latency = time.time() - float(meta["ts"])
+            END_TO_END.observe(latency, cmd=cmd)
+            print(f"⏱️ 명령 {meta.get('cmd_id')} ({cmd}) 전체 지연 {latency * 1000:.1f}ms")
+        return True
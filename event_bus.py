@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+
+import metrics
+
+# --- 메시지 종류 ---
+COMMANDS = ("light_on", "light_off", "motor_on", "motor_off")  # 기기 제어 명령
+EVENTS = ("person_detected",)  # 알림 이벤트
+
+# 구독자 소켓을 두는 디렉터리. 같은 장비의 모든 서비스가 이 디렉터리를 공유합니다.
+BUS_DIR = os.environ.get("BUS_DIR", "/tmp/smarthome_bus")
+MAX_MESSAGE_BYTES = 4096
+SEND_TIMEOUT = 0.02  # 구독자 수신 버퍼가 가득 찼을 때 기다리는 최대 시간 (초)
+
+PUBLISHED = metrics.counter("bus_published_total", "버스에 발행한 메시지 수", ["name"])
+DELIVERY_DROPS = metrics.counter("bus_delivery_drops_total", "구독자 버퍼가 가득 차거나 응답이 없어 버린 메시지 수", ["subscriber"])
+DELIVERY_LATENCY = metrics.histogram("bus_delivery_seconds", "발행부터 구독자 수신까지 걸린 시간", ["subscriber"])
+
+
+# --- 메시지 스키마 ---
+@dataclass
+class Message:
+    """버스로 주고받는 명령/이벤트. HTTP 요청 본문({"cmd", "cmd_id", "ts"})과 같은 정보를 담습니다."""
+
+    name: str  # COMMANDS 또는 EVENTS 중 하나
+    ts: float  # 발생 시각 (제스처 확정 프레임의 캡처 시각 등)
+    cmd_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    source: str = ""
+    sent_at: float = 0.0  # 버스에 발행한 시각
+
+    def __post_init__(self):
+        if self.name not in COMMANDS and self.name not in EVENTS:
+            raise ValueError(f"알 수 없는 메시지: {self.name}")
+
+    @property
+    def topic(self):
+        return "command" if self.name in COMMANDS else "event"
+
+    def to_payload(self):
+        """HTTP 브리지와 기존 핸들러가 쓰는 요청 본문 형식."""
+        return {"cmd": self.name, "cmd_id": self.cmd_id, "ts": self.ts}
+
+    def encode(self):
+        return json.dumps(asdict(self), separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def decode(cls, data):
+        return cls(**json.loads(data))
+
+
+# --- 발행 ---
+class EventBus:
+    """BUS_DIR의 모든 구독자 소켓(Unix 데이터그램)으로 메시지를 한 번씩 보냅니다.
+
+    중개 프로세스 없이 발행자가 직접 전달합니다. 구독자가 밀려 있으면 최대 SEND_TIMEOUT만 기다리고 버리므로
+    구독자가 느리거나 죽어 있어도 호출자(프레임 루프)가 오래 막히지 않습니다.
+    """
+
+    def __init__(self, source="", bus_dir=BUS_DIR):
+        self.source = source
+        self.bus_dir = bus_dir
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.settimeout(SEND_TIMEOUT)
+        self._lock = threading.Lock()
+
+    def subscribers(self):
+        try:
+            names = os.listdir(self.bus_dir)
+        except FileNotFoundError:
+            return []
+        return [name for name in names if name.endswith(".sock")]
+
+    def publish(self, name, origin_ts=None, cmd_id=None):
+        """메시지를 발행하고 cmd_id를 반환합니다."""
+        now = time.time()
+        message = Message(name, origin_ts if origin_ts is not None else now, source=self.source, sent_at=now)
+        if cmd_id:
+            message.cmd_id = cmd_id
+        data = message.encode()
+        PUBLISHED.inc(name=name)
+        with self._lock:
+            for sock_name in self.subscribers():
+                try:
+                    self._sock.sendto(data, os.path.join(self.bus_dir, sock_name))
+                except (TimeoutError, BlockingIOError, ConnectionRefusedError, FileNotFoundError):
+                    # 버퍼가 가득 찼거나 구독자가 종료된 경우: 기다리지 않고 버립니다.
+                    DELIVERY_DROPS.inc(subscriber=sock_name[:-5])
+        return message.cmd_id
+
+    def close(self):
+        self._sock.close()
+
+
+# --- 구독 ---
+class BusSubscriber:
+    """BUS_DIR/<name>.sock 에 바인드하고, 받은 메시지 중 topics에 해당하는 것을 handler(message)로 넘깁니다."""
+
+    def __init__(self, name, handler, topics=("command", "event"), bus_dir=BUS_DIR):
+        self.name = name
+        self.handler = handler
+        self.topics = set(topics)
+        if not os.path.isdir(bus_dir):
+            os.makedirs(bus_dir, exist_ok=True)
+            # /tmp처럼 누구나 소켓을 만들 수 있게 합니다. (sudo 서비스와 일반 사용자 서비스가 섞여 실행됨)
+            os.chmod(bus_dir, 0o1777)
+        self.path = os.path.join(bus_dir, f"{name}.sock")
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # 이전 실행이 남긴 소켓
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 256 * 1024)
+        self._sock.bind(self.path)
+        # sudo로 실행한 서비스의 소켓에도 일반 사용자 프로세스가 보낼 수 있게 합니다.
+        os.chmod(self.path, 0o666)
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        print(f"📬 버스 구독 시작: {self.name} ({', '.join(sorted(self.topics))})")
+        return self
+
+    def _loop(self):
+        while self._running:
+            try:
+                data = self._sock.recv(MAX_MESSAGE_BYTES)
+            except OSError:
+                break
+            try:
+                message = Message.decode(data)
+            except (ValueError, TypeError) as e:
+                print(f"⚠️ 잘못된 버스 메시지를 무시합니다 ({self.name}):", e)
+                continue
+            DELIVERY_LATENCY.observe(time.time() - message.sent_at, subscriber=self.name)
+            if message.topic in self.topics:
+                try:
+                    self.handler(message)
+                except Exception as e:
+                    print(f"❌ 버스 메시지 처리 실패 ({self.name}, {message.name}):", e)
+
+    def stop(self):
+        self._running = False
+        self._sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+# --- HTTP 브리지 (다른 장비의 서비스로 전달) ---
+def run_bridge(targets, topics_by_target):
+    """버스 메시지를 원격 HTTP 서버로 전달합니다. (예: 라즈베리파이 → Ubuntu PC 스피커 서버)"""
+    from command_dispatcher import CommandDispatcher
+
+    dispatcher = CommandDispatcher(targets)
+    subscribers = []
+    for target in targets:
+        def forward(message, target=target):
+            dispatcher.dispatch(message.name, targets=[target], origin_ts=message.ts, cmd_id=message.cmd_id)
+
+        subscribers.append(
+            BusSubscriber(f"bridge_{target}", forward, topics_by_target.get(target, ("command", "event"))).start()
+        )
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for sub in subscribers:
+            sub.stop()
+        dispatcher.close()
+
+
+if __name__ == "__main__":
+    from command_dispatcher import SPEAKER_URL
+
+    parser = argparse.ArgumentParser(description="로컬 이벤트 버스 → 원격 HTTP 브리지")
+    parser.add_argument(
+        "--forward", action="append", metavar="NAME=URL",
+        help="전달 대상 (여러 번 지정 가능). 기본: speaker=$SPEAKER_URL",
+    )
+    parser.add_argument(
+        "--commands-only", action="append", default=[], metavar="NAME",
+        help="명령만 전달할 대상 (예: 원격 gpio)",
+    )
+    args = parser.parse_args()
+
+    forwards = args.forward or [f"speaker={SPEAKER_URL}"]
+    targets = dict(item.split("=", 1) for item in forwards)
+    topics = {name: ("command",) for name in args.commands_only}
+    print("🌉 버스 브리지 시작:", ", ".join(f"{k} → {v}" for k, v in targets.items()))
+    run_bridge(targets, topics)
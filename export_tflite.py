@@ -0,0 +1,95 @@
+import argparse
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.preprocessing import image_dataset_from_directory
+
+from gesture_backends import TFLiteBackend
+
+
+# ------------------------------------------
+# 📌 대표 데이터셋 (int8 보정용)
+# ------------------------------------------
+def load_split(dataset_path, img_size, subset, batch_size=32):
+    """train_image.py와 동일한 분할/정규화(1/255)로 데이터셋을 불러옵니다."""
+    ds = image_dataset_from_directory(
+        dataset_path,
+        validation_split=0.2,
+        subset=subset,
+        seed=123,
+        image_size=img_size,
+        batch_size=batch_size,
+        label_mode="int",
+    )
+    return ds.map(lambda x, y: (x / 255.0, y))
+
+
+def representative_dataset(train_ds, num_samples):
+    def gen():
+        count = 0
+        for images, _ in train_ds:
+            for img in images:
+                yield [tf.expand_dims(img, 0)]
+                count += 1
+                if count >= num_samples:
+                    return
+    return gen
+
+
+# ------------------------------------------
+# 📌 변환
+# ------------------------------------------
+def convert_int8(model, train_ds, num_samples):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset(train_ds, num_samples)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.int8
+    converter.inference_output_type = tf.int8
+    return converter.convert()
+
+
+def convert_float16(model):
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+
+def evaluate(predict, val_ds):
+    correct = total = 0
+    for images, labels in val_ds:
+        for img, label in zip(images.numpy(), labels.numpy()):
+            preds = predict(img[np.newaxis].astype(np.float32))
+            correct += int(np.argmax(preds[0]) == label)
+            total += 1
+    return correct / max(total, 1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="hand_model.h5 → TFLite (int8 / float16) 변환")
+    parser.add_argument("dataset_path", help="train_set 폴더 (보정 및 정확도 검증용)")
+    parser.add_argument("--model", default="hand_model.h5")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--num-calibration", type=int, default=300)
+    args = parser.parse_args()
+
+    model = tf.keras.models.load_model(args.model)
+    _, height, width, _ = model.input_shape
+    train_ds = load_split(args.dataset_path, (height, width), "training")
+    val_ds = load_split(args.dataset_path, (height, width), "validation")
+
+    base = os.path.join(args.output_dir, os.path.splitext(os.path.basename(args.model))[0])
+    outputs = {
+        "int8": (f"{base}_int8.tflite", convert_int8(model, train_ds, args.num_calibration)),
+        "float16": (f"{base}_fp16.tflite", convert_float16(model)),
+    }
+
+    keras_acc = evaluate(lambda x: model(x, training=False).numpy(), val_ds)
+    print(f"📊 keras   : 정확도 {keras_acc:.3f}, 크기 {os.path.getsize(args.model) / 1e6:.1f}MB")
+    for kind, (path, tflite_model) in outputs.items():
+        with open(path, "wb") as f:
+            f.write(tflite_model)
+        acc = evaluate(TFLiteBackend(path).predict, val_ds)
+        print(f"📊 {kind:8s}: 정확도 {acc:.3f} ({acc - keras_acc:+.3f}), 크기 {len(tflite_model) / 1e6:.1f}MB → {path}")
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+
+# 추론 백엔드에서 사용할 CPU 스레드 수 (라즈베리 파이 4는 4코어)
+NUM_THREADS = int(os.environ.get("GESTURE_NUM_THREADS", "4"))
+
+
+# --- Keras(.h5) 백엔드 ---
+class KerasBackend:
+    """기존 방식: TensorFlow 전체를 로드해 float32 .h5 모델을 실행합니다.
+
+    model.predict()는 호출마다 tf.data 파이프라인을 새로 만들기 때문에,
+    고정 입력 시그니처로 컴파일한 tf.function을 직접 호출합니다.
+    """
+
+    name = "keras"
+    input_dtype = np.float32
+    input_transform = (1.0 / 255.0, 0.0)  # uint8 픽셀 → 모델 입력: x * scale + offset
+
+    def __init__(self, model_path):
+        import tensorflow as tf
+        from tensorflow.keras.models import load_model
+
+        self.model = load_model(model_path)
+        _, height, width, _ = self.model.input_shape
+        self.input_size = (width, height)
+        self._forward = tf.function(
+            lambda x: self.model(x, training=False),
+            input_signature=[tf.TensorSpec([None, height, width, 3], tf.float32)],
+        )
+
+    def predict_raw(self, batch):
+        """이미 입력 형식으로 전처리된 배치를 그대로 추론합니다."""
+        return self._forward(batch).numpy()
+
+    def predict(self, batch):
+        return self.predict_raw(np.asarray(batch, dtype=np.float32))
+
+    def warmup(self, batch_size=1):
+        """빈 배치로 한 번 추론해 그래프 추적/컴파일 비용을 첫 제스처 전에 치릅니다."""
+        width, height = self.input_size
+        self.predict_raw(np.zeros((batch_size, height, width, 3), dtype=np.float32))
+
+
+# --- TFLite 백엔드 (int8 / float16) ---
+class TFLiteBackend:
+    """export_tflite.py로 변환한 .tflite 모델을 XNNPACK 멀티스레드로 실행합니다.
+
+    tflite_runtime이 설치되어 있으면 TensorFlow 없이 동작하고,
+    없으면 tensorflow.lite의 Interpreter로 대체합니다.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path, num_threads=NUM_THREADS):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            from tensorflow.lite import Interpreter
+
+        # 최신 TFLite는 float/int8 연산에 XNNPACK 델리게이트를 기본 적용하며,
+        # num_threads로 스레드 풀 크기를 지정합니다.
+        self._make_interpreter = lambda: Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter = self._make_interpreter()
+        self.interpreter.allocate_tensors()
+        self.input_detail = self.interpreter.get_input_details()[0]
+        self.output_detail = self.interpreter.get_output_details()[0]
+        # 배치 크기(손 개수)가 바뀔 때마다 resize/allocate_tensors를 하면 그 프레임에 지연이 튀므로,
+        # 배치 크기별로 한 번만 할당한 인터프리터를 캐시해 둡니다. (손 개수는 GESTURE_MAX_HANDS 이하라 몇 개뿐)
+        self._interpreters = {int(self.input_detail["shape"][0]): self.interpreter}
+        _, height, width, _ = self.input_detail["shape"]
+        self.input_size = (int(width), int(height))
+
+        # int8 모델은 입력/출력 양자화 파라미터로 변환이 필요합니다.
+        self.input_dtype = self.input_detail["dtype"]
+        self.input_scale, self.input_zero = self.input_detail["quantization"]
+        self.output_scale, self.output_zero = self.output_detail["quantization"]
+        if self.input_dtype == np.float32:
+            self.input_transform = (1.0 / 255.0, 0.0)
+        else:
+            # 픽셀/255 정규화와 입력 양자화를 한 번의 곱셈/덧셈으로 합칩니다.
+            self.input_transform = (1.0 / (255.0 * self.input_scale), float(self.input_zero))
+
+    def predict(self, batch):
+        """0~1 범위 float 배치를 받아 필요하면 양자화한 뒤 추론합니다."""
+        if self.input_dtype != np.float32:
+            info = np.iinfo(self.input_dtype)
+            batch = np.clip(np.round(batch / self.input_scale + self.input_zero), info.min, info.max)
+        return self.predict_raw(batch.astype(self.input_dtype, copy=False))
+
+    def warmup(self, batch_size=1):
+        """1 ~ batch_size 배치로 한 번씩 추론해 인터프리터 할당과 XNNPACK 가중치 패킹 비용을 미리 치릅니다."""
+        width, height = self.input_size
+        for n in range(1, batch_size + 1):
+            self.predict_raw(np.zeros((n, height, width, 3), dtype=self.input_dtype))
+
+    def _interpreter_for(self, batch_size):
+        interpreter = self._interpreters.get(batch_size)
+        if interpreter is None:
+            interpreter = self._make_interpreter()
+            _, height, width, channels = self.input_detail["shape"]
+            interpreter.resize_tensor_input(self.input_detail["index"], [batch_size, height, width, channels])
+            interpreter.allocate_tensors()
+            self._interpreters[batch_size] = interpreter
+        return interpreter
+
+    def predict_raw(self, batch):
+        """이미 입력 형식(float32 또는 양자화된 int8)으로 전처리된 배치를 그대로 추론합니다."""
+        interpreter = self._interpreter_for(len(batch))
+        interpreter.set_tensor(self.input_detail["index"], batch)
+        interpreter.invoke()
+        preds = interpreter.get_tensor(self.output_detail["index"])
+        if preds.dtype != np.float32:
+            preds = (preds.astype(np.float32) - self.output_zero) * self.output_scale
+        return preds
+
+
+BACKENDS = {
+    KerasBackend.name: KerasBackend,
+    TFLiteBackend.name: TFLiteBackend,
+}
+
+
+def load_backend(kind, model_path):
+    """백엔드 이름("keras" / "tflite")으로 추론 백엔드를 생성합니다."""
+    if kind not in BACKENDS:
+        raise ValueError(f"알 수 없는 추론 백엔드: {kind} (사용 가능: {', '.join(BACKENDS)})")
+    return BACKENDS[kind](model_path)
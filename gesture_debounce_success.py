@@ -1,10 +1,70 @@
 import cv2
 import numpy as np
-import threading
+import os
+import signal
 import time
-import requests
-from tensorflow.keras.models import load_model
-# mediapipe는 스레드 함수 내부에서 import 합니다.
+import metrics
+from camera_capture import open_frame_source
+from command_dispatcher import GPIO_URL, SPEAKER_URL, open_dispatcher
+from dataset_capture import DatasetRecorder
+from gesture_backends import load_backend
+from gesture_decision import GestureDecision, HandDecisions, TraceRecorder
+from gesture_preprocess import FramePreprocessor, hand_bbox
+from hand_tracking import HandIdAssigner, RoiTracker, points_to_frame
+from landmark_classifier import LandmarkMLP, landmarks_to_array, landmarks_to_features
+from preview_server import PreviewServer, is_headless
+from startup import StartupTimer
+# mediapipe/TensorFlow는 시작 단계에서 모델 로드와 카메라 탐색을 겹쳐 실행하면서 import 합니다.
+
+# --- 분류기 선택 ---
+# "cnn": 손 영역을 잘라 hand_model.h5(MobileNetV2)로 분류
+# "landmark": MediaPipe 랜드마크 좌표를 작은 MLP(hand_landmark_mlp.npz)로 분류
+CLASSIFIER_MODE = os.environ.get("GESTURE_CLASSIFIER", "cnn")
+# cnn 모드의 추론 백엔드: "keras"(hand_model.h5) 또는 "tflite"(export_tflite.py 결과물)
+CNN_BACKEND = os.environ.get("GESTURE_BACKEND", "keras")
+CNN_MODEL_PATH = os.environ.get(
+    "GESTURE_MODEL", "hand_model_int8.tflite" if CNN_BACKEND == "tflite" else "hand_model.h5"
+)
+LANDMARK_MODEL_PATH = "hand_landmark_mlp.npz"
+# 한 프레임에서 인식할 최대 손 개수 (손마다 따로 디바운스)
+MAX_HANDS = int(os.environ.get("GESTURE_MAX_HANDS", "2"))
+# 1이면 손을 추적하는 동안 손 주변 영역(ROI)만 MediaPipe로 검출합니다.
+ROI_TRACKING = os.environ.get("GESTURE_ROI_TRACKING", "1") == "1"
+
+# --- 제스처 확정 설정 (gesture_decision.GestureDecision) ---
+# 평활화한 확률이 ENTER 임계값을 넘은 뒤 HOLD_TIME 동안 EXIT 임계값 위에 머물면 확정합니다.
+ENTER_THRESHOLDS = {"fan_off": 0.75, "fan_on": 0.75, "light_off": 0.75, "light_on": 0.75}
+EXIT_THRESHOLD = 0.5
+HOLD_TIME = 0.35  # 초 (기존 고정 0.8초 대신)
+COOLDOWN = 1.0  # 확정 후 다음 확정까지 최소 간격 (초)
+# 지정하면 종료 시 손별·프레임별 확률을 npz로 저장합니다. (python3 gesture_decision.py <파일>로 재생)
+TRACE_PATH = os.environ.get("GESTURE_TRACE_PATH")
+# 이 시간(초) 동안 새 프레임이 없으면 오류를 출력하고 종료합니다.
+NO_FRAME_TIMEOUT = 10.0
+
+# --- 학습 데이터 수집 (dataset_capture.DatasetRecorder) ---
+# 지정하면 손 이미지/랜드마크/예측을 이 폴더에 압축 샤드로 저장합니다. (python3 train_gesture.py --capture-shards <폴더>)
+CAPTURE_DIR = os.environ.get("GESTURE_CAPTURE_DIR")
+# 수집 중 보여 주는 제스처 이름 (예: fan_on). 지정하면 라벨로 저장하고, 예측이 다르면 어려운 샘플로 표시합니다.
+CAPTURE_LABEL = os.environ.get("GESTURE_CAPTURE_LABEL")
+
+# --- 화면 출력 설정 ---
+# 헤드리스 모드에서는 imshow/waitKey를 호출하지 않습니다. (종료: Ctrl+C)
+HEADLESS = is_headless()
+# 0이 아니면 http://<IP>:PREVIEW_PORT/ 에서 저주기 MJPEG 미리보기를 제공합니다.
+PREVIEW_PORT = int(os.environ.get("GESTURE_PREVIEW_PORT", "0"))
+
+# --- 지표 (/metrics) ---
+METRICS_PORT = int(os.environ.get("GESTURE_METRICS_PORT", "9101"))
+FRAME_AGE = metrics.histogram("gesture_frame_age_seconds", "캡처부터 분석 시작까지 걸린 시간")
+HAND_DETECT_LATENCY = metrics.histogram("gesture_hand_detect_seconds", "MediaPipe 손 검출 시간", ["region"])
+CLASSIFY_LATENCY = metrics.histogram("gesture_classify_seconds", "제스처 분류 시간", ["mode"])
+FRAMES_ANALYZED = metrics.counter("gesture_frames_analyzed_total", "분석한 프레임 수")
+FRAMES_SKIPPED = metrics.counter("gesture_frames_skipped_total", "분석이 밀려 건너뛴 프레임 수")
+HANDS_PER_FRAME = metrics.histogram(
+    "gesture_hands_per_frame", "한 번에 분류한 손 개수", buckets=tuple(range(1, MAX_HANDS + 1))
+)
+GESTURES_CONFIRMED = metrics.counter("gesture_confirmed_total", "확정된 제스처 명령 수", ["cmd"])
 
 # --- 부저 설정 ---
 try:
@@ -16,156 +76,260 @@ except (ImportError, Exception):
     print("알림: 라즈베리 파이 환경이 아닙니다. 부저 대신 콘솔에 메시지를 출력합니다.")
     IS_RASPBERRY_PI = False
 
-# --- GPIO 및 스피커 전송 함수 ---
-def send_to_gpio(cmd):
-    try:
-        res = requests.post("http://localhost:5000/control", json={"cmd": cmd})
-        print(f"📡 GPIO 서버 응답({cmd}):", res.text)
-    except:
-        print(f"❌ GPIO 전송 실패 ({cmd})")
+# --- GPIO 및 스피커 전송 (프레임 루프를 막지 않는 비동기 전송, COMMAND_TRANSPORT=bus이면 이벤트 버스) ---
+dispatcher = open_dispatcher({"gpio": GPIO_URL, "speaker": SPEAKER_URL}, source="gesture")
 
-def send_to_speaker(cmd):
-    try:
-        speaker_url = "http://10.10.15.167:8000/notify"
-        res = requests.post(speaker_url, json={"cmd": cmd})
-        print(f"🔊 스피커 응답({cmd}):", res.text)
-    except Exception as e:
-        print(f"❌ 스피커 전송 실패 ({cmd}):", e)
+# --- 시작 단계 (모델 로드/워밍업과 카메라 탐색을 동시에) ---
+startup = StartupTimer("gesture")
+
+def load_classifier():
+    """분류 모델을 로드하고 빈 입력으로 한 번 추론해 둡니다. (TensorFlow/TFLite는 백엔드 안에서 import)"""
+    if CLASSIFIER_MODE == "landmark":
+        return LandmarkMLP.load(LANDMARK_MODEL_PATH)
+    model = load_backend(CNN_BACKEND, CNN_MODEL_PATH)
+    model.warmup(MAX_HANDS)  # 손 개수별 배치 크기를 모두 미리 준비
+    return model
+
+def load_hand_detectors():
+    """MediaPipe를 import하고 전체 프레임용/ROI용 손 검출기를 만든 뒤 빈 이미지로 그래프를 초기화합니다."""
+    import mediapipe as mp
+    mp_hands = mp.solutions.hands
+    hands = mp_hands.Hands(static_image_mode=False, max_num_hands=MAX_HANDS, min_detection_confidence=0.7, model_complexity=0)
+    # ROI 추적용 인스턴스를 따로 둬서, 전체 프레임/ROI 입력이 번갈아도 각자의 내부 추적 상태가 섞이지 않게 합니다.
+    roi_hands = mp_hands.Hands(static_image_mode=False, max_num_hands=MAX_HANDS, min_detection_confidence=0.7, model_complexity=0) if ROI_TRACKING else None
+    blank = np.zeros((240, 320, 3), dtype=np.uint8)
+    for detector in (hands, roi_hands):
+        if detector is not None:
+            detector.process(blank)
+    return hands, roi_hands, list(mp_hands.HAND_CONNECTIONS)
 
 # --- 손 제스처 인식 스레드 ---
 def hand_gesture_thread():
     # --- ✨ 1. 디버깅 프린트 추가 ---
     print("✅ [1/5] 스레드 시작")
-    model = load_model("hand_model.h5")
-    # --- ✨ 2. 디버깅 프린트 추가 ---
-    print("✅ [2/5] Keras 모델 로딩 성공")
-    
-    class_names = ["fan_off", "fan_on", "light_off", "light_on"]
-
-    import mediapipe as mp
-    mp_hands = mp.solutions.hands
-    hands = mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.7, model_complexity=0)
-    mp_draw = mp.solutions.drawing_utils
 
-    # 카메라 자동 감지
-    cap = None
+    # 카메라 자동 감지 (CAMERA_SOURCE=broker이면 카메라 브로커의 공유 메모리에 연결)
+    # 캡처는 별도 스레드(또는 브로커 프로세스)에서 진행하고, 분석은 항상 가장 최신 프레임으로 합니다.
     # --- ✨ 3. 디버깅 프린트 추가 ---
-    print("🟡 [3/5] 카메라 탐색 시작...")
-    for i in range(3):
-        test_cap = cv2.VideoCapture(i)
-        if test_cap.isOpened():
-            print(f"✅ 카메라 {i} 사용 가능")
-            cap = test_cap
-            break
-            
-    if cap is None:
+    print("🟡 [2-3/5] 모델 로딩/워밍업과 카메라 탐색을 동시에 시작...")
+    loaded = startup.run_parallel({
+        "classifier": load_classifier,
+        "mediapipe": load_hand_detectors,
+        "camera": open_frame_source,
+    })
+    hands, roi_hands, hand_connections = loaded["mediapipe"]
+    grabber = loaded["camera"]
+
+    class_names = ["fan_off", "fan_on", "light_off", "light_on"]
+    if CLASSIFIER_MODE == "landmark":
+        landmark_model = loaded["classifier"]
+        class_names = landmark_model.class_names
+        # --- ✨ 2. 디버깅 프린트 추가 ---
+        print("✅ [2/5] 랜드마크 MLP 모델 로딩 성공")
+    else:
+        model = loaded["classifier"]
+        # 한 프레임의 모든 손을 한 배치로 분류합니다.
+        preprocessor = FramePreprocessor(model, max_batch=MAX_HANDS)
+        # --- ✨ 2. 디버깅 프린트 추가 ---
+        print(f"✅ [2/5] {model.name} 모델 로딩/워밍업 성공 ({CNN_MODEL_PATH})")
+
+    if grabber is None:
         print("❌ 카메라 열기 실패! 연결 상태를 확인하고 다른 프로그램이 카메라를 사용하고 있지 않은지 확인하세요.")
         return
 
     # --- ✨ 4. 디버깅 프린트 추가 ---
     print("✅ [4/5] 카메라 설정 완료")
 
-    # 제스처 인식 시간 설정 (0.8초)
-    CONFIRMATION_TIME = 0.8
-
     last_confirmed_gesture = None
-    candidate_gesture = None
-    candidate_timestamp = 0
+    # 손 ID → GestureDecision (손마다 독립적으로 평활화/확정, 쿨다운은 공유). replay()와 같은 규칙입니다.
+    hand_decisions = HandDecisions(lambda: GestureDecision(
+        class_names, enter_threshold=ENTER_THRESHOLDS, exit_threshold=EXIT_THRESHOLD,
+        hold_time=HOLD_TIME, cooldown=COOLDOWN,
+    ))
+    trace = TraceRecorder(class_names) if TRACE_PATH else None
+    recorder = DatasetRecorder(CAPTURE_DIR, class_names, label=CAPTURE_LABEL) if CAPTURE_DIR else None
+    if recorder is not None:
+        print(f"📦 학습 데이터 수집 모드: {CAPTURE_DIR} (라벨: {CAPTURE_LABEL or '없음'})")
+    hand_ids_assigner = HandIdAssigner()
+    roi_tracker = RoiTracker()
     
-    frame_counter = 0
+    frame_seq = 0
+    skipped_frames = 0
+    last_frame_at = time.monotonic()
+    rgb_buffer = None  # MediaPipe 입력용 RGB 버퍼 (프레임마다 재사용)
+
+    def draw_overlays(canvas, overlays):
+        for kind, *args in overlays:
+            if kind == "landmarks":
+                h, w = canvas.shape[:2]
+                pts = (args[0][:, :2] * (w, h)).astype(int)
+                for a, b in hand_connections:
+                    cv2.line(canvas, tuple(pts[a]), tuple(pts[b]), (255, 255, 255), 2)
+                for x, y in pts:
+                    cv2.circle(canvas, (x, y), 3, (0, 0, 255), -1)
+            elif kind == "label":
+                text, (x, y) = args
+                cv2.putText(canvas, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            elif kind == "box":
+                x1, y1, x2, y2 = args[0]
+                cv2.rectangle(canvas, (x1, y1), (x2, y2), (0, 255, 0), 2)
+
+    preview = PreviewServer(PREVIEW_PORT).start() if PREVIEW_PORT else None
+    if METRICS_PORT:
+        metrics.start_metrics_server(METRICS_PORT)
+    if HEADLESS:
+        print("🖥️ 헤드리스 모드: 화면 출력 없이 실행합니다. (종료: Ctrl+C)")
 
     # --- ✨ 5. 디버깅 프린트 추가 ---
     print("✅ [5/5] 메인 루프 시작")
-    while True:
-        # print("메인 루프 실행 중...") # 루프가 도는지 확인하고 싶을 때 이 줄의 주석(#)을 제거하세요.
-        ret, frame = cap.read()
-        if not ret:
-            print("❌ 프레임 읽기 실패. 카메라 연결이 불안정할 수 있습니다.")
-            continue
-
-        frame_counter += 1
-        # 2프레임당 1번 분석
-        if frame_counter % 2 != 0:
-            cv2.imshow("Hand Gesture Camera", frame)
-            if cv2.waitKey(1) & 0xFF == ord("q"):
-                break
-            continue
-
-        img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(img_rgb)
-        
-        hand_detected = False
-
-        if results.multi_hand_landmarks:
-            hand_detected = True
-            for hand_landmarks in results.multi_hand_landmarks:
-                h, w, _ = frame.shape
-                x_min, y_min = w, h
-                x_max, y_max = 0, 0
-                for lm in hand_landmarks.landmark:
-                    x, y = int(lm.x * w), int(lm.y * h)
-                    x_min, y_min = min(x_min, x), min(y_min, y)
-                    x_max, y_max = max(x_max, x), max(y_max, y)
-
-                pad = 20
-                x_min, y_min = max(x_min - pad, 0), max(y_min - pad, 0)
-                x_max, y_max = min(x_max + pad, w), min(y_max + pad, h)
-                
-                hand_img = frame[y_min:y_max, x_min:x_max]
-                if hand_img.size == 0:
-                    continue
-
-                hand_input = cv2.resize(hand_img, (128, 128)) / 255.0
-                hand_input = np.expand_dims(hand_input, axis=0)
-
-                preds = model.predict(hand_input, verbose=0)
-                class_idx = np.argmax(preds[0])
-                confidence = preds[0][class_idx]
-                
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-                if confidence > 0.8:
-                    current_gesture = class_names[class_idx]
-                    
-                    if current_gesture != candidate_gesture:
-                        candidate_gesture = current_gesture
-                        candidate_timestamp = time.time()
-                    else:
-                        elapsed_time = time.time() - candidate_timestamp
-                        label = f"{current_gesture} ({confidence:.2f})"
-                        cv2.putText(frame, label, (x_min, y_min - 10), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-                        
-                        if elapsed_time > CONFIRMATION_TIME and candidate_gesture != last_confirmed_gesture:
-                           
-                            cmd = ""
-                            if candidate_gesture == "fan_on": cmd = "motor_on"
-                            elif candidate_gesture == "fan_off": cmd = "motor_off"
-                            elif candidate_gesture == "light_on": cmd = "light_on"
-                            elif candidate_gesture == "light_off": cmd = "light_off"
-
-                            if cmd:
-                               print(f"▶️ 제스처 확정: {cmd}")
-                               send_to_gpio(cmd)
-                               threading.Thread(target=send_to_speaker, args=(cmd,), daemon=True).start()
-                               last_confirmed_gesture = candidate_gesture
-                               last_command_sent = candidate_gesture
-                               last_command_timestamp = time.time()
-
-                
-                cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 2)
-
-        if not hand_detected:
-            candidate_gesture = None
-            if last_confirmed_gesture and 'on' in last_confirmed_gesture:
-                last_confirmed_gesture = None
-
-        cv2.imshow("Hand Gesture Camera", frame)
-        if cv2.waitKey(1) & 0xFF == ord("q"):
-            break
-
-    print("메인 루프 종료. 프로그램 정리 중...")
-    cap.release()
-    cv2.destroyAllWindows()
+    # main_runner가 보내는 SIGTERM에도 루프를 빠져나와 수집 샤드/확률 기록을 저장하고 정리합니다.
+    running = True
+
+    def handle_stop(signum, _frame):
+        nonlocal running
+        running = False
+
+    signal.signal(signal.SIGTERM, handle_stop)
+    try:
+        while running:
+            # print("메인 루프 실행 중...") # 루프가 도는지 확인하고 싶을 때 이 줄의 주석(#)을 제거하세요.
+            # 추론 중에 들어온 프레임은 버려지므로, 건너뛰는 프레임 수가 부하에 따라 자동으로 조절됩니다.
+            seq, captured_at, frame = grabber.read_latest(frame_seq)
+            if frame is None:
+                # 카메라/브로커가 멈춘 채 조용히 도는 대신, 일정 시간 프레임이 없으면 종료해 감시 프로세스가 재시작하게 합니다.
+                if time.monotonic() - last_frame_at > NO_FRAME_TIMEOUT:
+                    print(f"❌ {NO_FRAME_TIMEOUT:.0f}초 동안 새 프레임이 없습니다. 카메라 연결을 확인하세요. 종료합니다.")
+                    break
+                continue
+            last_frame_at = time.monotonic()
+            FRAME_AGE.observe(time.time() - captured_at)
+            FRAMES_ANALYZED.inc()
+            if seq - frame_seq > 1:
+                FRAMES_SKIPPED.inc(seq - frame_seq - 1)
+            skipped_frames += seq - frame_seq - 1
+            frame_seq = seq
+
+            h, w, _ = frame.shape
+            # 직전 프레임에서 손을 안정적으로 추적 중이면 예측한 손 주변 영역만 검출합니다.
+            roi = roi_tracker.predict_roi(w, h) if ROI_TRACKING else None
+            if roi is None:
+                if rgb_buffer is None or rgb_buffer.shape != frame.shape:
+                    rgb_buffer = np.empty_like(frame)
+                img_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buffer)
+                detector = hands
+            else:
+                x1, y1, x2, y2 = roi
+                img_rgb = cv2.cvtColor(frame[y1:y2, x1:x2], cv2.COLOR_BGR2RGB)
+                detector = roi_hands
+            with HAND_DETECT_LATENCY.time(region="full" if roi is None else "roi"):
+                results = detector.process(img_rgb)
+
+            # 화면/미리보기에 그릴 항목 (실제 그리기는 화면 출력이 필요할 때만)
+            overlays = []
+
+            # 1) 손마다 박스를 구하고 분류 입력을 한 배치로 모읍니다.
+            hands_in_frame = []  # (프레임 기준 정규화 랜드마크 (21, 3), box)
+            for hand_landmarks in results.multi_hand_landmarks or []:
+                points = points_to_frame(landmarks_to_array(hand_landmarks), roi, w, h)
+                box = hand_bbox(points, w, h)
+                x_min, y_min, x_max, y_max = box
+                if CLASSIFIER_MODE != "landmark":
+                    hand_img = frame[y_min:y_max, x_min:x_max]
+                    if hand_img.size == 0:
+                        continue
+                    # 미리 할당한 배치 버퍼의 다음 칸에 리사이즈/정규화합니다.
+                    preprocessor.fill_crop(len(hands_in_frame), hand_img)
+                hands_in_frame.append((points, box))
+            if ROI_TRACKING:
+                roi_tracker.update([points for points, _ in hands_in_frame], roi, w, h)
+
+            # 2) 손이 여러 개여도 분류는 한 번의 추론으로 끝냅니다.
+            preds = []
+            if hands_in_frame:
+                classify_start = time.perf_counter()
+                if CLASSIFIER_MODE == "landmark":
+                    features = np.stack([
+                        landmarks_to_features(points, w, h) for points, _ in hands_in_frame
+                    ])
+                    preds = landmark_model.predict(features)
+                else:
+                    preds = model.predict_raw(preprocessor.batch_view(len(hands_in_frame)))
+                CLASSIFY_LATENCY.observe(time.perf_counter() - classify_start, mode=CLASSIFIER_MODE)
+                HANDS_PER_FRAME.observe(len(hands_in_frame))
+
+            # 3) 손 ID별로 확률을 평활화해 제스처를 확정합니다.
+            hand_ids = hand_ids_assigner.assign([box for _, box in hands_in_frame])
+            if trace is not None:
+                trace.add_frame(captured_at, hand_ids, preds)
+            # 잠깐 안 보인 손은 상태를 유지하고(한 프레임 누락으로 처음부터 다시 세지 않음), 추적이 끝난 손만 지웁니다.
+            hand_decisions.prune(hand_ids_assigner.active_ids)
+            if recorder is not None:
+                recorder.prune(hand_ids_assigner.active_ids)
+
+            for (points, (x_min, y_min, x_max, y_max)), hand_id, hand_preds in zip(
+                hands_in_frame, hand_ids, preds
+            ):
+                confirmed = hand_decisions.update(hand_id, hand_preds, captured_at)
+                decision = hand_decisions.decisions[hand_id]
+                if recorder is not None:
+                    # 손 영역 복사만 하고, 압축/저장은 기록 스레드에서 합니다.
+                    recorder.add(hand_id, frame, (x_min, y_min, x_max, y_max), points, hand_preds, captured_at)
+
+                overlays.append(("landmarks", points))
+                if decision.candidate is not None:
+                    label = f"#{hand_id} {decision.candidate} ({decision.confidence:.2f})"
+                    overlays.append(("label", label, (x_min, y_min - 10)))
+
+                # 같은 명령을 두 손이 연달아 보내지 않도록 마지막 확정 제스처는 모든 손이 공유합니다.
+                if confirmed is not None and confirmed != last_confirmed_gesture:
+
+                    cmd = ""
+                    if confirmed == "fan_on": cmd = "motor_on"
+                    elif confirmed == "fan_off": cmd = "motor_off"
+                    elif confirmed == "light_on": cmd = "light_on"
+                    elif confirmed == "light_off": cmd = "light_off"
+
+                    if cmd:
+                       # 확정시킨 프레임의 캡처 시각을 함께 보내 제스처 → 릴레이 지연을 추적합니다.
+                       cmd_id = dispatcher.dispatch(cmd, origin_ts=captured_at)
+                       GESTURES_CONFIRMED.inc(cmd=cmd)
+                       print(f"▶️ 제스처 확정: {cmd} (손 #{hand_id}, {cmd_id})")
+                       last_confirmed_gesture = confirmed
+
+                overlays.append(("box", (x_min, y_min, x_max, y_max)))
+
+            if not hands_in_frame:
+                if last_confirmed_gesture and 'on' in last_confirmed_gesture:
+                    last_confirmed_gesture = None
+
+            # 첫 프레임을 끝까지 처리한 시점에 콜드 스타트 시간을 한 번 보고합니다.
+            startup.mark_ready()
+
+            if preview is not None and preview.wants_frame:
+                preview.publish(frame, lambda canvas, overlays=overlays: draw_overlays(canvas, overlays))
+
+            if not HEADLESS:
+                # 직접 캡처/브로커 프레임 모두 이 루프만 쓰는 배열(브로커는 공유 메모리에서 복사한 사본)이라 바로 그립니다.
+                draw_overlays(frame, overlays)
+                cv2.imshow("Hand Gesture Camera", frame)
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+    except KeyboardInterrupt:
+        pass
+
+    print(f"메인 루프 종료. 프로그램 정리 중... (건너뛴 프레임: {skipped_frames})")
+    grabber.stop()
+    dispatcher.close()
+    if recorder is not None:
+        recorder.close()
+        print(f"📦 수집 완료: 샘플 {recorder.samples_written}개, 샤드 {recorder.shards_written}개 ({CAPTURE_DIR})")
+    if trace is not None:
+        trace.save(TRACE_PATH)
+        print(f"💾 확률 기록 저장: {TRACE_PATH} ({trace.frames} 프레임)")
+    if preview is not None:
+        preview.stop()
+    if not HEADLESS:
+        cv2.destroyAllWindows()
 
 # --- 프로그램 시작점 ---
 if __name__ == "__main__":
@@ -0,0 +1,212 @@
+import argparse
+import math
+
+import numpy as np
+
+
+# --- 확률 평활화 기반 제스처 확정 ---
+class GestureDecision:
+    """프레임별 softmax 벡터를 시간 기준 지수 이동 평균(EWMA)으로 평활화해 제스처를 확정합니다.
+
+    - 평활화: 프레임 간격 dt마다 alpha = 1 - exp(-dt / tau)로 섞으므로 FPS가 바뀌어도 반응 속도가 같습니다.
+    - 히스테리시스: 평균 확률이 enter 임계값을 넘으면 후보가 되고, exit 임계값 아래로 내려갈 때까지 유지됩니다.
+      노이즈 프레임 하나로 후보가 초기화되지 않습니다.
+    - 후보가 hold_time 동안 유지되면 한 번 확정하며, 후보가 바뀌거나 풀릴 때까지 다시 확정하지 않습니다.
+    - cooldown: 확정 후 이 시간 동안은 다른 제스처도 확정하지 않습니다.
+
+    enter/exit 임계값은 숫자(모든 제스처 공통) 또는 {제스처 이름: 값} 사전으로 지정합니다. (사전에 없는 제스처는 기본값)
+    """
+
+    def __init__(self, class_names, tau=0.15, enter_threshold=0.75, exit_threshold=0.5,
+                 hold_time=0.35, cooldown=1.0):
+        self.class_names = list(class_names)
+        self.tau = tau
+        self.enter = self._per_class(enter_threshold, default=0.75)
+        self.exit = self._per_class(exit_threshold, default=0.5)
+        self.hold_time = hold_time
+        self.cooldown = cooldown
+        self.reset()
+        self.last_fired_at = -math.inf
+
+    def _per_class(self, value, default):
+        if isinstance(value, dict):
+            return np.array([value.get(name, default) for name in self.class_names], dtype=np.float32)
+        return np.full(len(self.class_names), value, dtype=np.float32)
+
+    def reset(self):
+        """손이 사라졌을 때 호출합니다. (쿨다운은 유지)"""
+        self.smoothed = None
+        self.last_time = None
+        self.active = None  # 현재 후보 클래스 인덱스
+        self.active_since = 0.0
+        self.fired = False  # 현재 후보를 이미 확정했는지
+
+    @property
+    def candidate(self):
+        return None if self.active is None else self.class_names[self.active]
+
+    @property
+    def confidence(self):
+        return 0.0 if self.active is None else float(self.smoothed[self.active])
+
+    def update(self, probs, now):
+        """확률 벡터 하나를 반영하고, 이번에 확정된 제스처 이름(없으면 None)을 반환합니다."""
+        probs = np.asarray(probs, dtype=np.float32)
+        if self.smoothed is None:
+            self.smoothed = probs.copy()
+        else:
+            alpha = 1.0 - math.exp(-max(now - self.last_time, 0.0) / self.tau)
+            self.smoothed += alpha * (probs - self.smoothed)
+        self.last_time = now
+
+        top = int(np.argmax(self.smoothed))
+        if self.active is not None and self.smoothed[self.active] < self.exit[self.active]:
+            self.active = None
+        if self.smoothed[top] >= self.enter[top] and top != self.active:
+            # 새 후보 (또는 더 확실한 다른 제스처로 교체)
+            self.active = top
+            self.active_since = now
+            self.fired = False
+
+        if (
+            self.active is not None
+            and not self.fired
+            and now - self.active_since >= self.hold_time
+            and now - self.last_fired_at >= self.cooldown
+        ):
+            self.fired = True
+            self.last_fired_at = now
+            return self.class_names[self.active]
+        return None
+
+
+# --- 여러 손의 확정 엔진 ---
+class HandDecisions:
+    """손 ID별 GestureDecision 묶음. 실행 중 루프와 replay()가 같은 규칙으로 씁니다.
+
+    추적이 끝난 손(prune)의 평활화 상태는 버리지만 쿨다운은 모든 손이 공유합니다.
+    그래서 손이 사라졌다가 새 ID로 다시 잡혀도 직전 확정 후 cooldown 동안은 다시 확정하지 않습니다.
+    """
+
+    def __init__(self, make_decision):
+        self.make_decision = make_decision  # 인자 없이 새 GestureDecision을 만드는 함수
+        self.decisions = {}
+        self.last_fired_at = -math.inf
+
+    def update(self, hand_id, probs, now):
+        decision = self.decisions.get(hand_id)
+        if decision is None:
+            decision = self.decisions[hand_id] = self.make_decision()
+        decision.last_fired_at = self.last_fired_at
+        gesture = decision.update(probs, now)
+        self.last_fired_at = decision.last_fired_at
+        return gesture
+
+    def prune(self, active_ids):
+        """추적이 끝난 손의 엔진을 지웁니다. (잠깐 안 보인 손은 상태 유지)"""
+        for hand_id in list(self.decisions):
+            if hand_id not in active_ids:
+                del self.decisions[hand_id]
+
+
+# --- 확률 시퀀스 기록 / 재생 ---
+NO_HAND = -1  # 손이 없던 프레임을 나타내는 손 ID
+
+
+class TraceRecorder:
+    """실행 중 프레임별·손별 확률 벡터를 모아 replay()로 다시 돌려 볼 수 있는 npz로 저장합니다.
+
+    한 프레임의 손들은 같은 시각의 행으로 기록되고, 손이 없던 프레임은 hand_id NO_HAND와 NaN 확률 한 행입니다.
+    """
+
+    def __init__(self, class_names):
+        self.class_names = list(class_names)
+        self.times = []
+        self.hand_ids = []
+        self.probs = []
+        self.frames = 0
+
+    def add_frame(self, t, hand_ids, probs):
+        """한 프레임의 손 ID 목록과 확률 목록을 기록합니다."""
+        self.frames += 1
+        if not len(hand_ids):
+            hand_ids, probs = [NO_HAND], [np.full(len(self.class_names), np.nan, dtype=np.float32)]
+        for hand_id, p in zip(hand_ids, probs):
+            self.times.append(t)
+            self.hand_ids.append(hand_id)
+            self.probs.append(p)
+
+    def save(self, path):
+        np.savez_compressed(
+            path,
+            t=np.array(self.times, dtype=np.float64),
+            hand_ids=np.array(self.hand_ids, dtype=np.int32),
+            probs=np.array(self.probs, dtype=np.float32).reshape(-1, len(self.class_names)),
+            class_names=np.array(self.class_names),
+        )
+
+
+def load_trace(path):
+    """npz 기록(t: (N,), hand_ids: (N,), probs: (N, C), class_names: (C,))을 불러옵니다.
+
+    hand_ids가 없는 이전 기록은 손 하나(ID 0)로, NaN 행은 손이 없던 프레임으로 읽습니다.
+    """
+    data = np.load(path, allow_pickle=False)
+    probs = data["probs"]
+    if "hand_ids" in data.files:
+        hand_ids = data["hand_ids"]
+    else:
+        hand_ids = np.where(np.isnan(probs).any(axis=1), NO_HAND, 0).astype(np.int32)
+    return data["t"], hand_ids, probs, [str(name) for name in data["class_names"]]
+
+
+def replay(hands, times, hand_ids, probs, max_missing=5):
+    """기록된 시퀀스를 HandDecisions에 넣어 [(시각, 손 ID, 확정된 제스처), ...]를 반환합니다.
+
+    실행 중 HandIdAssigner와 같이, 손이 max_missing 프레임 넘게 연속으로 안 보일 때만 그 손의 상태를 지웁니다.
+    """
+    fired = []
+    missing = {}  # 손 ID → 연속으로 안 보인 프레임 수
+    i = 0
+    while i < len(times):
+        # 같은 시각의 행들이 한 프레임입니다.
+        j = i + 1
+        while j < len(times) and times[j] == times[i]:
+            j += 1
+        t = float(times[i])
+        seen = [(int(hand_ids[k]), probs[k]) for k in range(i, j) if hand_ids[k] != NO_HAND]
+        seen_ids = {hand_id for hand_id, _ in seen}
+        for hand_id in seen_ids:
+            missing[hand_id] = 0
+        for hand_id in list(missing):
+            if hand_id not in seen_ids:
+                missing[hand_id] += 1
+                if missing[hand_id] > max_missing:
+                    del missing[hand_id]
+        hands.prune(missing)
+        for hand_id, p in seen:
+            gesture = hands.update(hand_id, p, t)
+            if gesture is not None:
+                fired.append((t, hand_id, gesture))
+        i = j
+    return fired
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="기록된 확률 시퀀스로 제스처 확정 결과 확인")
+    parser.add_argument("trace", help="t / hand_ids / probs / class_names 배열이 담긴 .npz")
+    parser.add_argument("--tau", type=float, default=0.15)
+    parser.add_argument("--enter", type=float, default=0.75)
+    parser.add_argument("--exit", type=float, default=0.5)
+    parser.add_argument("--hold", type=float, default=0.35)
+    parser.add_argument("--cooldown", type=float, default=1.0)
+    args = parser.parse_args()
+
+    times, hand_ids, probs, class_names = load_trace(args.trace)
+    hands = HandDecisions(
+        lambda: GestureDecision(class_names, args.tau, args.enter, args.exit, args.hold, args.cooldown)
+    )
+    fired = replay(hands, times, hand_ids, probs)
+    for t, hand_id, gesture in fired:
+        print(f"▶️ {t - times[0]:7.3f}s  #{hand_id} {gesture}")
+    print(f"✅ 확정 {len(fired)}회 / 프레임 {len(np.unique(times))}개")
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+
+def hand_bbox(points, width, height, pad=20):
+    """정규화 랜드마크 배열(21, 2 이상)을 감싸는 박스에 pad만큼 여유를 두고 프레임 범위로 자른 (x_min, y_min, x_max, y_max)."""
+    xy = points[:, :2] * (width, height)
+    x_min, y_min = np.maximum(xy.min(axis=0).astype(int) - pad, 0)
+    x_max, y_max = np.minimum(xy.max(axis=0).astype(int) + pad, (width, height))
+    return int(x_min), int(y_min), int(x_max), int(y_max)
+
+
+# --- 재사용 버퍼 기반 전처리 ---
+class FramePreprocessor:
+    """프레임마다 새 배열을 만들지 않도록 미리 할당한 버퍼에 전처리 결과를 씁니다.
+
+    fill_crop()은 손 영역을 uint8 버퍼로 리사이즈한 뒤, 백엔드 입력 형식(float32 또는 int8)으로
+    배치 버퍼에 바로 정규화합니다. (기존 resize()/255.0은 매번 float64 배열을 새로 만들었습니다.)
+    """
+
+    def __init__(self, backend, max_batch=1):
+        width, height = backend.input_size
+        self.input_size = (width, height)
+        self.scale, self.offset = backend.input_transform
+        self.dtype = np.dtype(backend.input_dtype)
+
+        self._resized = np.empty((height, width, 3), dtype=np.uint8)
+        self._scaled = np.empty((height, width, 3), dtype=np.float32)
+        self.batch = np.empty((max_batch, height, width, 3), dtype=self.dtype)
+        if self.dtype != np.float32:
+            info = np.iinfo(self.dtype)
+            self._clip = (info.min, info.max)
+
+    def fill_crop(self, index, crop):
+        """crop을 리사이즈/정규화해 batch[index]에 씁니다."""
+        cv2.resize(crop, self.input_size, dst=self._resized)
+        if self.dtype == np.float32:
+            out = self.batch[index]
+            np.multiply(self._resized, self.scale, out=out, casting="unsafe")
+            if self.offset:
+                out += self.offset
+        else:
+            np.multiply(self._resized, self.scale, out=self._scaled, casting="unsafe")
+            self._scaled += self.offset
+            np.rint(self._scaled, out=self._scaled)
+            np.clip(self._scaled, *self._clip, out=self._scaled)
+            np.copyto(self.batch[index], self._scaled, casting="unsafe")
+
+    def batch_view(self, count):
+        return self.batch[:count]
@@ -1,8 +1,11 @@
 from flask import Flask, request, jsonify
 import RPi.GPIO as GPIO
-import time
+import metrics
+from device_state import COMMANDS, DeviceStateEngine
+from event_bus import BusSubscriber
 
 app = Flask(__name__)
+metrics.register_metrics_endpoint(app)
 
 # --- GPIO 핀 설정 ---
 LIGHT_RELAY_PIN = 17
@@ -43,38 +46,108 @@ def set_motor(direction, speed_percentage):
     pwm_motor.ChangeDutyCycle(speed_percentage)
     print(f"⚙️  모터 {direction} 방향, {speed_percentage}% 속도 설정.")
 
+# --- 기기 상태 엔진 ---
+# 조명/모터의 현재 상태를 기억해 같은 명령이 반복되면 GPIO/PWM 쓰기를 생략하고,
+# 여러 입력(제스처/사람 감지/LLM)에서 몰려온 명령은 기기별로 가장 최근 것만 반영합니다.
+DEVICE_COMMANDS = {
+    "light_on": ("light", "on"),
+    "light_off": ("light", "off"),
+    "motor_on": ("motor", "on"),  # fan_on 제스처에 해당
+    "motor_off": ("motor", "off"),  # fan_off 제스처에 해당
+}
+MOTOR_SPEED = 70
+# 응답에 함께 돌려줄 명령별 설정 (기존 /control 응답 형식 유지)
+COMMAND_DETAILS = {"motor_on": {"direction": "forward", "speed": MOTOR_SPEED}}
+# HTTP 요청이 반영 결과를 기다리는 최대 시간 (초). 넘기면 202로 접수만 알립니다.
+APPLY_WAIT = 1.0
+
+def set_light(state):
+    GPIO.output(LIGHT_RELAY_PIN, GPIO.HIGH if state == "on" else GPIO.LOW)
+    print("💡 조명 ON" if state == "on" else "💡 조명 OFF")
+
+def set_fan(state):
+    if state == "on":
+        set_motor("forward", MOTOR_SPEED)
+    else:
+        set_motor("stop", 0)
+
+engine = DeviceStateEngine(
+    DEVICE_COMMANDS,
+    {"light": set_light, "motor": set_fan},
+    {"light": "off", "motor": "off"},  # 위 GPIO 초기화와 같은 상태
+)
+
 # --- 통합 제어 엔드포인트 ---
 @app.route('/control', methods=['POST'])
 def control_device():
-    data = request.get_json()
-    cmd = data.get("cmd")
-
-    if cmd == "light_on":
-        GPIO.output(LIGHT_RELAY_PIN, GPIO.HIGH)
-        print("💡 조명 ON")
-        return jsonify({"status": "light_on"}), 200
-    elif cmd == "light_off":
-        GPIO.output(LIGHT_RELAY_PIN, GPIO.LOW)
-        print("💡 조명 OFF")
-        return jsonify({"status": "light_off"}), 200
-    elif cmd == "motor_on":
-        set_motor("forward", 70) # fan_on 제스처에 해당
-        return jsonify({"status": "motor_on", "direction": "forward", "speed": 70}), 200
-    elif cmd == "motor_off":
-        set_motor("stop", 0) # fan_off 제스처에 해당
-        return jsonify({"status": "motor_off"}), 200
-    else:
+    # 다른 장비(Ubuntu PC의 LLM 등)에서 오는 HTTP 경로
+    body, code = handle_command(request.get_json(silent=True), wait=APPLY_WAIT)
+    return jsonify(body), code
+
+@app.route('/control/batch', methods=['POST'])
+def control_batch():
+    """여러 명령을 한 번에 받습니다. 본문: {"cmds": [{"cmd": ...}, ...]} 또는 명령 목록.
+
+    같은 기기에 대한 명령은 마지막 것만 반영됩니다. 알 수 없는 명령이 하나라도 있으면 아무것도 반영하지 않고 400을 반환합니다.
+    """
+    data = request.get_json(silent=True)
+    items = data.get("cmds", []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return jsonify({"error": "invalid request", "detail": "cmds must be a list"}), 400
+    items = [item if isinstance(item, dict) else {"cmd": item} for item in items]
+    if not all(isinstance(item.get("cmd"), str) for item in items):
+        return jsonify({"error": "invalid request", "detail": "every cmd must be a string"}), 400
+    unknown = [item["cmd"] for item in items if item["cmd"] not in engine.commands]
+    if unknown:
+        print("❓ 알 수 없는 명령이 있어 일괄 요청을 거부합니다:", unknown)
+        COMMANDS.inc(len(unknown), cmd="unknown")
+        return jsonify({"error": "unknown command", "cmds": unknown}), 400
+    accepted = {}
+    results = []
+    for item in items:
+        body, _ = handle_command(item)
+        results.append(body)
+        accepted[body["device"]] = body["seq"]
+    applied = all(engine.wait(device, seq, APPLY_WAIT) for device, seq in accepted.items())
+    return jsonify({"results": results, "state": engine.snapshot()}), 200 if applied else 202
+
+@app.route('/state', methods=['GET'])
+def get_state():
+    return jsonify(engine.snapshot()), 200
+
+def handle_command(data, wait=0.0):
+    """HTTP 요청 본문 또는 버스 메시지({"cmd", "cmd_id", "ts"})를 접수하고 (응답 본문, 상태 코드)를 반환합니다.
+
+    wait > 0이면 반영될 때까지(최대 wait초) 기다린 뒤 현재 상태와 함께 200을, 아니면 접수만 하고 202를 반환합니다.
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("cmd"), str):
+        print("❓ 잘못된 요청 본문:", data)
+        COMMANDS.inc(cmd="unknown")
+        return {"error": "invalid request", "detail": "body must be an object with a string cmd"}, 400
+    cmd = data["cmd"]
+    try:
+        device, seq = engine.submit(cmd, data)
+    except KeyError:
         print("❓ 알 수 없는 명령:", cmd)
-        return jsonify({"error": "unknown command"}), 400
+        COMMANDS.inc(cmd="unknown")
+        return {"error": "unknown command", "cmd": cmd}, 400
+    body = {"status": cmd, "device": device, "seq": seq, **COMMAND_DETAILS.get(cmd, {})}
+    if wait > 0 and engine.wait(device, seq, wait):
+        body["state"] = engine.snapshot()[device]["state"]
+        return body, 200
+    return body, 202
 
 @app.route('/')
 def health_check():
     return "✅ 통합 GPIO 제어 서버 실행 중!", 200
 
 if __name__ == '__main__':
+    # 같은 장비의 제스처 인식 등이 버스에 발행한 명령을 HTTP 없이 받습니다.
+    subscriber = BusSubscriber("gpio", lambda message: handle_command(message.to_payload()), topics=("command",)).start()
     try:
         app.run(host='0.0.0.0', port=5000)
     finally:
+        subscriber.stop()
         pwm_motor.stop()
         GPIO.cleanup()
         print("GPIO 정리 완료.")
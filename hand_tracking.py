@@ -0,0 +1,158 @@
+import itertools
+
+import numpy as np
+
+
+# --- 손 ID 부여 ---
+class HandIdAssigner:
+    """프레임마다 검출된 손 박스를 이전 프레임의 손과 중심 거리로 짝지어 같은 ID를 유지합니다.
+
+    MediaPipe는 결과 순서를 보장하지 않으므로, 손마다 따로 디바운스하려면 안정적인 ID가 필요합니다.
+    중심 거리가 max_distance(박스 대각선 대비 비율)를 넘으면 새 손으로 보고 새 ID를 줍니다.
+    """
+
+    def __init__(self, max_distance=0.6, max_missing=5):
+        self.max_distance = max_distance
+        self.max_missing = max_missing  # 이 프레임 수만큼 안 보이면 ID를 버립니다
+        self._next_id = itertools.count(1)
+        self._tracks = {}  # hand_id → {"center": (x, y), "diag": 대각선 길이, "missing": 연속 미검출 수}
+
+    def assign(self, boxes):
+        """boxes: [(x_min, y_min, x_max, y_max), ...] → 같은 순서의 hand_id 목록."""
+        centers = [((x1 + x2) / 2.0, (y1 + y2) / 2.0) for x1, y1, x2, y2 in boxes]
+        diags = [max(np.hypot(x2 - x1, y2 - y1), 1.0) for x1, y1, x2, y2 in boxes]
+
+        # 가까운 쌍부터 탐욕적으로 짝짓습니다. (손은 많아야 두세 개라 전체 쌍을 봐도 충분히 빠릅니다)
+        pairs = []
+        for i, (cx, cy) in enumerate(centers):
+            for hand_id, track in self._tracks.items():
+                dist = np.hypot(cx - track["center"][0], cy - track["center"][1])
+                if dist <= self.max_distance * max(diags[i], track["diag"]):
+                    pairs.append((dist, i, hand_id))
+
+        ids = [None] * len(boxes)
+        used = set()
+        for _, i, hand_id in sorted(pairs):
+            if ids[i] is None and hand_id not in used:
+                ids[i] = hand_id
+                used.add(hand_id)
+
+        for i in range(len(boxes)):
+            if ids[i] is None:
+                ids[i] = next(self._next_id)
+            self._tracks[ids[i]] = {"center": centers[i], "diag": diags[i], "missing": 0}
+
+        for hand_id in list(self._tracks):
+            if hand_id not in ids:
+                self._tracks[hand_id]["missing"] += 1
+                if self._tracks[hand_id]["missing"] > self.max_missing:
+                    del self._tracks[hand_id]
+        return ids
+
+    @property
+    def active_ids(self):
+        return set(self._tracks)
+
+
+# --- 관심 영역(ROI) 추적 ---
+def points_to_frame(points, roi, width, height):
+    """ROI 이미지 기준 정규화 좌표(21, 3)를 전체 프레임 기준 정규화 좌표로 제자리 변환합니다."""
+    if roi is None:
+        return points
+    x1, y1, x2, y2 = roi
+    roi_w, roi_h = x2 - x1, y2 - y1
+    points[:, 0] = (x1 + points[:, 0] * roi_w) / width
+    points[:, 1] = (y1 + points[:, 1] * roi_h) / height
+    points[:, 2] *= roi_w / width  # z는 x와 같은 축척을 씁니다
+    return points
+
+
+class RoiTracker:
+    """이전 프레임의 손 박스를 알파-베타 필터로 예측해 다음 프레임의 검출 영역을 정합니다.
+
+    예측한 박스에 margin만큼 여유를 둔 정사각형 영역만 MediaPipe에 넣고, 손을 놓치거나
+    검출 결과가 예측과 크게 어긋나거나(중심이 튀거나 크기가 급변) 손이 영역 가장자리에 닿으면
+    다음 프레임은 전체 프레임에서 다시 검출합니다.
+    새로 들어온 손을 찾기 위해 refresh_interval 프레임마다 한 번은 전체 프레임을 봅니다.
+    손이 여러 개면 모든 손을 감싸는 박스 하나를 추적합니다.
+    """
+
+    def __init__(self, margin=0.35, refresh_interval=30, alpha=0.6, beta=0.3, edge_tolerance=0.02,
+                 max_roi_fraction=0.6, max_jump=0.5, max_scale_change=1.6):
+        self.margin = margin
+        self.refresh_interval = refresh_interval
+        self.alpha = alpha  # 위치 보정 비율
+        self.beta = beta  # 속도 보정 비율
+        self.edge_tolerance = edge_tolerance
+        self.max_roi_fraction = max_roi_fraction  # ROI가 프레임의 이 비율보다 크면 이득이 없어 전체 프레임 사용
+        # 추적 품질 기준: 예측 중심에서 박스 크기 대비 max_jump 넘게 벗어나거나, 박스 넓이가 max_scale_change배 넘게 변하면
+        # ROI 안에서 다른 물체를 잡았거나 손을 놓치는 중으로 보고 전체 프레임에서 다시 찾습니다.
+        self.max_jump = max_jump
+        self.max_scale_change = max_scale_change
+        self.state = None  # [cx, cy, w, h] (픽셀)
+        self.velocity = np.zeros(2)
+        self.tracking = False
+        self.frames_since_full = 0
+
+    def predict_roi(self, width, height):
+        """이번 프레임에서 검출할 (x1, y1, x2, y2). None이면 전체 프레임."""
+        if not self.tracking or self.frames_since_full >= self.refresh_interval:
+            return None
+        cx, cy = self.state[:2] + self.velocity
+        size = max(self.state[2], self.state[3]) * (1.0 + 2.0 * self.margin)
+        x1, x2 = np.clip([cx - size / 2, cx + size / 2], 0, width).astype(int)
+        y1, y2 = np.clip([cy - size / 2, cy + size / 2], 0, height).astype(int)
+        if x2 - x1 < 2 or y2 - y1 < 2 or (x2 - x1) * (y2 - y1) > self.max_roi_fraction * width * height:
+            return None
+        return int(x1), int(y1), int(x2), int(y2)
+
+    def update(self, points_list, roi, width, height):
+        """이번 프레임의 검출 결과(프레임 기준 정규화 랜드마크 목록)로 필터를 갱신합니다."""
+        self.frames_since_full = 0 if roi is None else self.frames_since_full + 1
+        if not points_list:
+            self.tracking = False
+            self.state = None
+            self.velocity[:] = 0.0
+            return
+
+        allpts = np.concatenate([p[:, :2] for p in points_list]) * (width, height)
+        (x_min, y_min), (x_max, y_max) = allpts.min(axis=0), allpts.max(axis=0)
+        measured = np.array([(x_min + x_max) / 2, (y_min + y_max) / 2, x_max - x_min, y_max - y_min])
+
+        # 처음 잡았거나 예측과 어긋나면 새로 시작하고, 다음 프레임은 전체 프레임에서 확인합니다.
+        if self.state is None or not self._consistent(measured):
+            self.state = measured
+            self.velocity[:] = 0.0
+            self.tracking = False
+            return
+
+        predicted = self.state[:2] + self.velocity
+        residual = measured[:2] - predicted
+        self.state[:2] = predicted + self.alpha * residual
+        self.velocity += self.beta * residual
+        self.state[2:] += self.alpha * (measured[2:] - self.state[2:])
+
+        self.tracking = not self._touches_edge(
+            roi, (x_min, y_min, x_max, y_max), width, height
+        )
+
+    def _consistent(self, measured):
+        """측정한 박스가 알파-베타 예측과 이어지는지 확인합니다."""
+        predicted = self.state[:2] + self.velocity
+        jump = np.hypot(*(measured[:2] - predicted)) / max(self.state[2], self.state[3], 1.0)
+        scale = (measured[2] * measured[3] + 1.0) / (self.state[2] * self.state[3] + 1.0)
+        return jump <= self.max_jump and 1.0 / self.max_scale_change <= scale <= self.max_scale_change
+
+    def _touches_edge(self, roi, extent, width, height):
+        # 손이 ROI 밖으로 걸쳐 있으면 잘린 채 검출된 것이므로 추적을 신뢰하지 않습니다. (프레임 경계는 제외)
+        if roi is None:
+            return False
+        x1, y1, x2, y2 = roi
+        x_min, y_min, x_max, y_max = extent
+        tol = self.edge_tolerance * max(x2 - x1, y2 - y1)
+        return (
+            (x1 > 0 and x_min - x1 < tol)
+            or (y1 > 0 and y_min - y1 < tol)
+            or (x2 < width and x2 - x_max < tol)
+            or (y2 < height and y2 - y_max < tol)
+        )
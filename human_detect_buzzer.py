@@ -1,7 +1,13 @@
 import cv2
-import requests
-from time import sleep, time
-from ultralytics import YOLO
+import os
+from time import perf_counter, sleep, time
+import metrics
+from camera_capture import open_frame_source
+from command_dispatcher import SPEAKER_URL, open_dispatcher
+from motion_gate import PERSON_SEEN_TIMEOUT, AdaptiveInterval, MotionGate
+from person_detectors import load_detector
+from preview_server import PreviewServer, is_headless
+from startup import StartupTimer
 
 # --- 라즈베리 파이 환경 자동 감지 및 부저 설정 ---
 try:
@@ -13,33 +19,65 @@ except (ImportError, Exception):
     print("알림: 라즈베리 파이 환경이 아닙니다. 부저 대신 콘솔에 메시지를 출력합니다.")
     IS_RASPBERRY_PI = False
 
-# --- GPIO 및 스피커 전송 함수 ---
-def send_to_speaker(cmd):
-    try:
-        speaker_url = "http://10.10.15.167:8000/notify"  # 또는 실제 스피커 서버 IP
-        res = requests.post(speaker_url, json={"cmd": cmd})
-        print(f"🔊 스피커 응답({cmd}):", res.text)
-    except Exception as e:
-        print(f"❌ 스피커 전송 실패 ({cmd}):", e)
+# --- 스피커 전송 (비동기, COMMAND_TRANSPORT=bus이면 이벤트 버스) ---
+dispatcher = open_dispatcher({"speaker": SPEAKER_URL}, source="person")
 
 # --- YOLOv5 모델 로드 ---
-print("YOLOv5 모델을 로드하는 중입니다...")
-model = YOLO("yolov5n.pt")  # 'n' 모델은 가볍고 빠릅니다.
-PERSON_CLASS_ID = 0  # YOLO 모델에서 'person' 클래스는 0번입니다.
-
-# --- 웹캠 설정 ---
-cap = cv2.VideoCapture(2)
-if not cap.isOpened():
+# "ultralytics": PyTorch로 yolov5n.pt 실행 (기존 방식)
+# "onnx": person_detectors.py로 내보낸 ONNX 모델을 onnxruntime으로 실행 (PyTorch 로드 없음)
+PERSON_BACKEND = os.environ.get("PERSON_BACKEND", "ultralytics")
+PERSON_MODEL_PATH = os.environ.get(
+    "PERSON_MODEL", "yolov5nu.onnx" if PERSON_BACKEND == "onnx" else "yolov5n.pt"
+)
+# 추론 입력 크기 (작을수록 빠름). onnx 모델은 내보낼 때 고정한 크기를 우선합니다.
+PERSON_INPUT_SIZE = int(os.environ.get("PERSON_INPUT_SIZE", "320" if PERSON_BACKEND == "onnx" else "640"))
+# 모델 로드(+ 빈 프레임 워밍업)와 카메라 탐색을 동시에 진행합니다. (PyTorch/onnxruntime은 검출기 안에서 import)
+# --- 웹캠 설정 (CAMERA_SOURCE=broker이면 카메라 브로커의 공유 메모리에 연결) ---
+startup = StartupTimer("person")
+
+def load_person_detector():
+    detector = load_detector(PERSON_BACKEND, PERSON_MODEL_PATH, PERSON_INPUT_SIZE)  # 'n' 모델은 가볍고 빠릅니다.
+    detector.warmup()
+    return detector
+
+print(f"YOLOv5 모델을 로드하는 중입니다... ({PERSON_BACKEND}, {PERSON_MODEL_PATH})")
+loaded = startup.run_parallel({"detector": load_person_detector, "camera": lambda: open_frame_source([2])})
+detector, camera = loaded["detector"], loaded["camera"]
+print(f"모델 로드/워밍업 완료 ({startup.phases['detector']:.2f}초)")
+if camera is None:
     print("오류: 웹캠을 열 수 없습니다.")
     exit()
 
+# --- 화면 출력 설정 ---
+# 헤드리스 모드에서는 imshow/waitKey를 호출하지 않습니다. (종료: Ctrl+C)
+HEADLESS = is_headless()
+# 0이 아니면 http://<IP>:PREVIEW_PORT/ 에서 저주기 MJPEG 미리보기를 제공합니다.
+PREVIEW_PORT = int(os.environ.get("PERSON_PREVIEW_PORT", "0"))
+preview = PreviewServer(PREVIEW_PORT).start() if PREVIEW_PORT else None
+
+# --- 지표 (/metrics) ---
+METRICS_PORT = int(os.environ.get("PERSON_METRICS_PORT", "9102"))
+if METRICS_PORT:
+    metrics.start_metrics_server(METRICS_PORT)
+FRAME_AGE = metrics.histogram("person_frame_age_seconds", "캡처부터 분석 시작까지 걸린 시간")
+YOLO_LATENCY = metrics.histogram("person_yolo_seconds", "YOLO 추론 시간 (전처리/후처리 포함)", ["backend"])
+FRAMES = metrics.counter("person_frames_total", "처리한 프레임 수")
+INFERENCES = metrics.counter("person_inferences_total", "YOLO 추론 횟수")
+PERSON_EVENTS = metrics.counter("person_events_total", "사람 등장/퇴장 이벤트 수", ["event"])
+
 # --- 상태 변수 및 상수 초기화 ---
 detection_state = "NO_PERSON"
 last_person_seen_time = 0
-PERSON_SEEN_TIMEOUT = 2.0  # 초
 last_known_box = None
 frame_count = 0
-PROCESS_FRAME_INTERVAL = 3  # 3프레임마다 한 번씩만 추론하여 성능 확보
+frame_seq = 0
+inference_count = 0
+PROCESS_FRAME_INTERVAL = 3  # 사람이 보이거나 움직임이 클 때: 3프레임마다 추론
+IDLE_FRAME_INTERVAL = 15  # 작은 움직임만 있을 때: 15프레임마다 추론 (정지 장면은 추론 생략)
+
+# 저해상도 프레임 차분으로 정지 장면에서는 YOLO를 건너뜁니다.
+motion_gate = MotionGate()
+inference_interval = AdaptiveInterval(dense=PROCESS_FRAME_INTERVAL, sparse=IDLE_FRAME_INTERVAL)
 
 # --- 함수 정의: 부저 제어 ---
 def buzzer_on():
@@ -57,7 +95,7 @@ def buzzer_on():
     else:
         print("🎶 딩동! (사람 감지 알림)")
         
-    send_to_speaker("person_detected")
+    dispatcher.dispatch("person_detected")
 
 def buzzer_off():
     """사람이 사라졌을 때 호출되는 함수"""
@@ -66,64 +104,89 @@ def buzzer_off():
     if IS_RASPBERRY_PI:
         buzzer.stop()
 
+def draw_person_box(canvas, box):
+    x1, y1, x2, y2 = box
+    cv2.rectangle(canvas, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    cv2.putText(canvas, "Person", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+
 # --- 메인 프로그램 루프 ---
-print("출입 감지 시스템을 시작합니다. (YOLOv5, 종료: 'q' 키)")
+quit_hint = "Ctrl+C" if HEADLESS else "'q' 키"
+print(f"출입 감지 시스템을 시작합니다. (YOLOv5, 종료: {quit_hint})")
 
 try:
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        seq, captured_at, frame = camera.read_latest(frame_seq, timeout=5.0)
+        if frame is None:
             print("오류: 웹캠에서 프레임을 읽을 수 없습니다.")
             break
+        frame_seq = seq
+        FRAME_AGE.observe(time() - captured_at)
+        FRAMES.inc()
 
         frame_count += 1
         person_found_this_frame = False
 
-        # 지정된 간격마다 YOLO 추론 수행
-        if frame_count % PROCESS_FRAME_INTERVAL == 0:
-            # YOLO 모델로 추론 수행
-            results = model.predict(frame, conf=0.5, verbose=False, classes=[PERSON_CLASS_ID])
+        # 움직임과 감지 상태에 따라 YOLO 추론 여부 결정
+        motion = motion_gate.update(frame)
+        person_recently_seen = time() - last_person_seen_time < PERSON_SEEN_TIMEOUT
+        if inference_interval.should_infer(motion, person_recently_seen):
+            inference_count += 1
+            INFERENCES.inc()
+            # YOLO 모델로 추론 수행 (person 클래스만, 신뢰도 높은 순)
+            inference_start = perf_counter()
+            detections = detector.detect(frame)
+            YOLO_LATENCY.observe(perf_counter() - inference_start, backend=PERSON_BACKEND)
 
             # 결과에서 사람 찾기
-            for result in results:
-                if len(result.boxes) > 0:
-                    person_found_this_frame = True
-                    # 가장 신뢰도 높은 사람의 박스 정보 저장
-                    best_box = result.boxes[0].xyxy[0]
-                    last_known_box = tuple(map(int, best_box))
-                    last_person_seen_time = time()
-                    break # 한 프레임에 한 명만 추적
+            if detections:
+                person_found_this_frame = True
+                # 가장 신뢰도 높은 사람의 박스 정보 저장 (한 프레임에 한 명만 추적)
+                last_known_box = tuple(detections[0][:4])
+                last_person_seen_time = time()
 
         # --- 상태에 따른 부저 제어 ---
         is_person_currently_visible = time() - last_person_seen_time < PERSON_SEEN_TIMEOUT
 
         if is_person_currently_visible and detection_state == "NO_PERSON":
             detection_state = "PERSON_SEEN"
+            PERSON_EVENTS.inc(event="appeared")
             buzzer_on()
         elif not is_person_currently_visible and detection_state == "PERSON_SEEN":
             detection_state = "NO_PERSON"
+            PERSON_EVENTS.inc(event="left")
             buzzer_off()
             last_known_box = None # 사람이 사라지면 박스 정보도 삭제
 
-        # --- 화면 출력 ---
-        if last_known_box:
-            x1, y1, x2, y2 = last_known_box
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(frame, "Person", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+        # 첫 프레임을 끝까지 처리한 시점에 콜드 스타트 시간을 한 번 보고합니다.
+        startup.mark_ready()
 
-        cv2.imshow("Person Detection System (YOLOv5)", frame)
+        # --- 화면 출력 (브로커의 공유 프레임에는 그리지 않고 사본에 그림) ---
+        if preview is not None and preview.wants_frame:
+            box = last_known_box
+            preview.publish(frame, (lambda canvas: draw_person_box(canvas, box)) if box else None)
 
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+        if not HEADLESS:
+            canvas = frame if frame.flags.writeable else frame.copy()
+            if last_known_box:
+                draw_person_box(canvas, last_known_box)
+
+            cv2.imshow("Person Detection System (YOLOv5)", canvas)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
 
 except KeyboardInterrupt:
     print("\n프로그램을 강제 종료합니다.")
 
 finally:
     # 프로그램 종료 시 모든 리소스 정리
-    print("시스템을 종료하고 리소스를 해제합니다.")
-    cap.release()
-    cv2.destroyAllWindows()
+    print(f"시스템을 종료하고 리소스를 해제합니다. (YOLO 추론 {inference_count}/{frame_count} 프레임)")
+    dispatcher.close()
+    camera.stop()
+    if preview is not None:
+        preview.stop()
+    if not HEADLESS:
+        cv2.destroyAllWindows()
     if IS_RASPBERRY_PI:
         buzzer.off()
         buzzer.close()
@@ -0,0 +1,112 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+INTENTS = ("light_on", "light_off", "motor_on", "motor_off")
+
+# LLM 프롬프트의 few-shot 예시이자, 로컬 즉시 매칭 테이블의 원본입니다.
+FEW_SHOT_EXAMPLES = [
+    ("불 켜", "light_on"),
+    ("조명 켜줘", "light_on"),
+    ("불 꺼줘", "light_off"),
+    ("조명 꺼", "light_off"),
+    ("밝다", "light_off"),
+    ("덥다", "motor_on"),
+    ("너무 어두워", "light_on"),
+    ("너무 덥다", "motor_on"),
+    ("춥다", "motor_off"),
+    ("어둡다", "light_on"),
+    ("light on", "light_on"),
+    ("light off", "light_off"),
+    ("선풍기 켜줘", "motor_on"),
+    ("선풍기 꺼줘", "motor_off"),
+    ("fan on", "motor_on"),
+    ("fan off", "motor_off"),
+    ("너무 더워", "motor_on"),
+    ("자야겠다", "light_off"),
+    ("너무 추워", "motor_off"),
+    ("너무 춥다", "motor_off"),
+    ("너무 밝아", "light_off"),
+]
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text):
+    """대소문자, 문장부호, 공백 차이를 없앤 비교용 문자열을 만듭니다."""
+    text = unicodedata.normalize("NFC", text).lower()
+    return _NON_WORD.sub("", text)
+
+
+def char_ngrams(text, n=2):
+    if len(text) < n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def ngram_similarity(a, b):
+    """문자 n-gram Dice 계수 (0~1)."""
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+# --- 로컬 의도 판별기 ---
+class IntentResolver:
+    """LLM 호출 전에 자주 쓰는 명령을 로컬에서 바로 판별합니다.
+
+    1) 정규화 후 완전 일치 (few-shot 예시 + 이전 LLM 응답 LRU 캐시)
+    2) 문자 n-gram 유사도 기반 퍼지 매칭 (임계값과, 다른 의도와의 점수 차 조건을 모두 만족할 때만)
+    둘 다 실패하면 None을 반환하며, 호출 측에서 LLM을 사용합니다.
+    """
+
+    def __init__(self, examples=FEW_SHOT_EXAMPLES, fuzzy_threshold=0.8, fuzzy_margin=0.15, cache_size=256):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_margin = fuzzy_margin
+        self.cache_size = cache_size
+        self._exact = {normalize(text): intent for text, intent in examples}
+        self._grams = [(char_ngrams(key), intent) for key, intent in self._exact.items()]
+        self._llm_cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resolve(self, text):
+        """(의도, 출처, 점수)를 반환합니다. 판별하지 못하면 의도는 None입니다."""
+        key = normalize(text)
+        if not key:
+            return None, "empty", 0.0
+
+        if key in self._exact:
+            return self._exact[key], "exact", 1.0
+
+        with self._lock:
+            if key in self._llm_cache:
+                self._llm_cache.move_to_end(key)
+                return self._llm_cache[key], "cache", 1.0
+
+        # 의도별 최고 유사도를 구해, 1등이 충분히 높고 2등과 차이가 날 때만 채택합니다.
+        grams = char_ngrams(key)
+        best = {}
+        for example_grams, intent in self._grams:
+            score = ngram_similarity(grams, example_grams)
+            if score > best.get(intent, 0.0):
+                best[intent] = score
+        ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+        if ranked:
+            intent, score = ranked[0]
+            runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+            if score >= self.fuzzy_threshold and score - runner_up >= self.fuzzy_margin:
+                return intent, "fuzzy", score
+            return None, "miss", score
+        return None, "miss", 0.0
+
+    def remember(self, text, intent):
+        """LLM이 유효한 의도를 돌려준 문장을 LRU 캐시에 저장합니다."""
+        if intent not in INTENTS:
+            return
+        key = normalize(text)
+        with self._lock:
+            self._llm_cache[key] = intent
+            self._llm_cache.move_to_end(key)
+            while len(self._llm_cache) > self.cache_size:
+                self._llm_cache.popitem(last=False)
@@ -0,0 +1,71 @@
+import numpy as np
+
+# MediaPipe 손 랜드마크 개수 (손목 0번 ~ 새끼손가락 끝 20번)
+NUM_LANDMARKS = 21
+FEATURE_SIZE = NUM_LANDMARKS * 3
+MIDDLE_MCP = 9  # 가운데 손가락 시작 관절 (손 크기 기준으로 사용)
+# 특징 계산 방식 버전. 2: 정규화 좌표를 픽셀 비율(가로/세로)로 되돌린 뒤 계산. 이전 버전 모델은 다시 학습해야 합니다.
+FEATURE_VERSION = 2
+
+
+# --- 랜드마크 → 특징 벡터 ---
+def landmarks_to_array(hand_landmarks):
+    """MediaPipe hand_landmarks 객체를 (21, 3) float32 배열로 변환합니다."""
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+
+def landmarks_to_features(points, width, height):
+    """(21, 3) 랜드마크를 손목 기준으로 옮기고 손 크기로 나눠 위치/거리에 무관한 특징으로 만듭니다.
+
+    MediaPipe 좌표는 x를 이미지 너비, y를 높이로 나눈 값이라 4:3/16:9 화면에서 손 모양이 찌그러집니다.
+    width, height(픽셀)를 곱해 실제 비율로 되돌린 뒤 계산합니다. (z는 MediaPipe와 같이 너비 기준)
+    """
+    points = np.asarray(points, dtype=np.float32)[:, :3] * np.array([width, height, width], dtype=np.float32)
+    rel = points - points[0]
+    scale = np.linalg.norm(rel[MIDDLE_MCP, :2])
+    if scale < 1e-6:
+        scale = np.abs(rel).max() or 1.0
+    return (rel / scale).reshape(-1)
+
+
+# --- 작은 MLP 추론기 (NumPy) ---
+class LandmarkMLP:
+    """train_landmark.py가 저장한 .npz 가중치로 동작하는 2층 MLP 분류기."""
+
+    def __init__(self, w1, b1, w2, b2, mean, std, class_names):
+        self.w1 = w1.astype(np.float32)
+        self.b1 = b1.astype(np.float32)
+        self.w2 = w2.astype(np.float32)
+        self.b2 = b2.astype(np.float32)
+        self.mean = mean.astype(np.float32)
+        self.inv_std = (1.0 / np.maximum(std, 1e-6)).astype(np.float32)
+        self.class_names = [str(c) for c in class_names]
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        version = int(data["feature_version"]) if "feature_version" in data.files else 1
+        if version != FEATURE_VERSION:
+            print(f"⚠️ {path}는 이전 방식의 랜드마크 특징으로 학습된 모델입니다. train_landmark.py로 다시 학습하세요.")
+        return cls(
+            data["w1"], data["b1"], data["w2"], data["b2"],
+            data["mean"], data["std"], data["class_names"],
+        )
+
+    def save(self, path):
+        np.savez(
+            path,
+            w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2,
+            mean=self.mean, std=1.0 / self.inv_std,
+            class_names=np.array(self.class_names),
+            feature_version=FEATURE_VERSION,
+        )
+
+    def predict(self, features):
+        """(N, 63) 또는 (63,) 특징을 받아 (N, 클래스 수) softmax 확률을 반환합니다."""
+        x = (np.atleast_2d(features) - self.mean) * self.inv_std
+        h = np.maximum(x @ self.w1 + self.b1, 0.0)
+        logits = h @ self.w2 + self.b2
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
@@ -1,10 +1,14 @@
 import threading
 from flask import Flask, request
-from gtts import gTTS
 import os
 import time
 import requests
 import logging
+import metrics
+from command_dispatcher import COMMAND_TRANSPORT, open_dispatcher
+from intent_resolver import FEW_SHOT_EXAMPLES, IntentResolver
+from ollama_client import OllamaIntentClient
+from tts_player import AudioPlayer, TTSCache
 log = logging.getLogger('werkzeug')
 log.setLevel(logging.ERROR)  # 또는 logging.CRITICAL
 import subprocess
@@ -13,95 +17,109 @@ import subprocess
 # 🔈 Flask 음성 피드백 서버
 # -----------------------------
 app = Flask(__name__)
+metrics.register_metrics_endpoint(app)
 
-def speak(text_or_file):
-    """파일이 존재하면 파일 재생, 아니면 gTTS"""
+NOTIFY_REQUESTS = metrics.counter("notify_requests_total", "/notify 요청 수", ["cmd"])
+INTENT_RESOLUTIONS = metrics.counter("intent_resolutions_total", "자연어 명령 판별 경로", ["source"])
+LLM_LATENCY = metrics.histogram("llm_intent_seconds", "Ollama 의도 추출 시간")
+
+# 명령별 음성: 녹음 파일이 있으면 파일을, 없으면 문장을 TTS로 재생합니다.
+COMMAND_SPEECH = {
+    "light_on": ("light on.mp3", "조명을 켭니다"),
+    "light_off": ("light off.mp3", "조명을 끕니다"),
+    "motor_on": ("fan on.mp3", "선풍기를 켭니다"),
+    "motor_off": ("fan off.mp3", "선풍기를 끕니다"),
+    "person_detected": ("human.mp3", "사람이 감지되었습니다"),
+}
+
+tts_cache = TTSCache()
+
+def resolve_speech(text_or_file):
+    """파일이 존재하면 파일 경로, 아니면 gTTS 캐시 경로"""
     if os.path.exists(text_or_file):
-        os.system(f"mpg123 '{text_or_file}'")
+        return text_or_file
+    return tts_cache.get(text_or_file)
+
+player = AudioPlayer(resolve_speech)
+
+def speak(text_or_file):
+    """재생 대기열에 넣고 바로 반환합니다. (합성/재생은 플레이어 스레드에서 진행)"""
+    player.enqueue(text_or_file)
+
+def announce(cmd):
+    NOTIFY_REQUESTS.inc(cmd=cmd if cmd in COMMAND_SPEECH else "unknown")
+    if cmd in COMMAND_SPEECH:
+        audio_file, text = COMMAND_SPEECH[cmd]
+        speak(audio_file if os.path.exists(audio_file) else text)
     else:
-        from gtts import gTTS
-        tts = gTTS(text=text_or_file, lang='ko')
-        tts.save("speech.mp3")
-        os.system("mpg123 -q speech.mp3")
+        print("🔇 명령 없음:", cmd)
 
 @app.route("/notify", methods=["POST"])
 def notify():
+    # 다른 장비(라즈베리파이)에서 오는 HTTP 브리지 경로
     data = request.get_json()
-    cmd = data.get("cmd")
-
-    if cmd == "light_on":
-        speak("light on.mp3")
-    elif cmd == "light_off":
-        speak("light off.mp3")
-    elif cmd == "motor_on":
-        speak("fan on.mp3")
-    elif cmd == "motor_off":
-        speak("fan off.mp3")
-    elif cmd == "person_detected":
-        speak("human.mp3")
-    else:
-        print("🔇 명령 없음:", cmd)
-
+    announce(data.get("cmd"))
     return "OK", 200
 
+def prerender_command_speech():
+    """녹음 파일이 없는 명령 문장을 미리 합성해 둡니다."""
+    tts_cache.prerender(
+        text for audio_file, text in COMMAND_SPEECH.values() if not os.path.exists(audio_file)
+    )
+
 def run_flask_server():
+    threading.Thread(target=prerender_command_speech, daemon=True).start()
+    if COMMAND_TRANSPORT == "bus":
+        # 같은 장비에서 발행한 명령/이벤트는 HTTP를 거치지 않고 버스로 받습니다.
+        from event_bus import BusSubscriber
+        BusSubscriber("speaker", lambda message: announce(message.name)).start()
     print("🚀 Flask 음성 서버 시작 (port 8000)")
     app.run(host="0.0.0.0", port=8000, debug=False)
 
 # -----------------------------
 # 🤖 자연어 명령 처리 루프
 # -----------------------------
+# few-shot 예시는 intent_resolver.FEW_SHOT_EXAMPLES 한 곳에서 관리합니다.
+PROMPT_PREFIX = (
+    "\n너는 smart home을 제어하는 모델이야 다음 문장을 반드시 아래 중 하나로만 변환해. "
+    "근데 문장은 직접 명령일 수도 있고 감정/상태 표현일 수도 있어: light_on / light_off / motor_on / motor_off\n"
+    "예시:\n"
+    + "".join(f'- "{text}" → {intent}\n' for text, intent in FEW_SHOT_EXAMPLES)
+)
+
+ollama = OllamaIntentClient(PROMPT_PREFIX)
+
 def ask_ollama(prompt):
-    response = requests.post(
-        "http://localhost:11434/api/generate",
-        json={
-            "model": "gemma3:1b",
-            "prompt": f"""
-너는 smart home을 제어하는 모델이야 다음 문장을 반드시 아래 중 하나로만 변환해. 근데 문장은 직접 명령일 수도 있고 감정/상태 표현일 수도 있어: light_on / light_off / motor_on / motor_off
-예시:
-- "불 켜" → light_on
-- "조명 켜줘" → light_on
-- "불 꺼줘" → light_off
-- "조명 꺼" → light_off
-- "밝다" → light_off
-- "덥다" → motor_on
-- "너무 어두워" → light_on
-- "너무 덥다" → motor_on
-- "춥다" → motor_off
-- "어둡다" → light_on
-- "light on" → light_on
-- "light off" → light_off
-- "선풍기 켜줘" → motor_on
-- "선풍기 꺼줘" → motor_off
-- "fan on" → motor_on
-- "fan off" → motor_off
-- "너무 더워" → motor_on
-- "자야겠다" → light_off
-- "너무 추워" → motor_off
-- "너무 춥다" → motor_off
-- "너무 밝아" → light_off
-
-문장: "{prompt}"
-정답:""",
-            "stream": False
-        }
-    )
-    return response.json()["response"].strip()
+    """스트리밍으로 호출해 의도 토큰이 나오는 즉시 반환합니다."""
+    return ollama.ask(prompt)
 
-def send_to_raspberry(cmd):
-    pi_url = "http://10.10.15.195:5000/control"  # 🖐 IP 주소 확인!
-    try:
-        res = requests.post(pi_url, json={"cmd": cmd})
-        print("📡 Pi 응답:", res.text)
-    except Exception as e:
-        print("❌ Pi 전송 실패:", e)
+# 자주 쓰는 명령은 LLM을 거치지 않고 로컬에서 바로 판별합니다.
+resolver = IntentResolver()
 
-def send_to_speaker(cmd):
+def resolve_intent(user_input):
+    cmd, source, score = resolver.resolve(user_input)
+    if cmd:
+        INTENT_RESOLUTIONS.inc(source=source)
+        print(f"⚡ 로컬 판별({source}, {score:.2f}):", cmd)
+        return cmd
+    INTENT_RESOLUTIONS.inc(source="llm")
     try:
-        res = requests.post("http://localhost:8000/notify", json={"cmd": cmd})
-        print("🔊 스피커 응답:", res.text)
-    except Exception as e:
-        print("❌ 스피커 전송 실패:", e)
+        with LLM_LATENCY.time():
+            cmd = ask_ollama(user_input)
+    except (requests.RequestException, ValueError) as e:  # 연결 오류 / 깨진 JSON 응답
+        print("❌ LLM 호출 실패:", e)
+        return None
+    print("📥 LLM 응답:", cmd)
+    resolver.remember(user_input, cmd)
+    return cmd
+
+# 라즈베리파이 GPIO 서버와 로컬 스피커 서버로 비동기 전송
+# (COMMAND_TRANSPORT=bus이면 버스에 발행하고, 라즈베리파이로는 event_bus.py 브리지가 전달)
+PI_GPIO_URL = os.environ.get("GPIO_URL", "http://10.10.15.195:5000/control")  # 🖐 IP 주소 확인!
+dispatcher = open_dispatcher({
+    "gpio": PI_GPIO_URL,
+    "speaker": "http://localhost:8000/notify",
+}, source="llm")
 
 # -----------------------------
 # 🧠 메인 실행부
@@ -109,6 +127,7 @@ def send_to_speaker(cmd):
 if __name__ == "__main__":
     # Flask 서버 백그라운드 실행
     threading.Thread(target=run_flask_server, daemon=True).start()
+    threading.Thread(target=ollama.warmup, daemon=True).start()
     time.sleep(1)  # 서버 부팅 대기
 
     while True:
@@ -116,11 +135,12 @@ if __name__ == "__main__":
         if user_input.lower() == "exit":
             break
 
-        cmd = ask_ollama(user_input)
-        print("📥 LLM 응답:", cmd)
+        cmd = resolve_intent(user_input)
 
         if cmd in ["light_on", "light_off", "motor_on", "motor_off"]:
-            send_to_raspberry(cmd)
-            send_to_speaker(cmd)
+            dispatcher.dispatch(cmd)
         else:
             print("⚠️ 실행할 명령이 아님 (unknown)")
+
+    dispatcher.close()
+    player.close()
@@ -1,51 +1,221 @@
-import subprocess
-import time
-import os
-
-# 각 스크립트 파일명 (실제 경로에 맞게 수정 필요)
-# 예를 들어, 모든 파일이 같은 디렉토리에 있다면 파일명만 적어도 됩니다.
-SCRIPTS = [
-    "gpio_server.py",
-    "gesture_debounce_success.py",    # 제스처 인식 코드 (이름이 gesture_recognition.py로 바뀌었으면 그 이름으로)
-    
-]
-
-# 실행된 프로세스들을 저장할 리스트
-processes = []
-
-print("모든 프로젝트 스크립트를 시작합니다...")
-
-try:
-    for script in SCRIPTS:
-        print(f"✅ {script} 시작 중...")
-        # 'python3' 대신 'python'을 사용하거나, 환경에 맞게 조정
-        # '-u' 옵션은 버퍼링 없이 즉시 표준 출력을 표시하게 합니다 (디버깅에 유용).
-        process = subprocess.Popen(['python3', '-u', script])
-        processes.append(process)
-        time.sleep(1) # 각 스크립트가 시작될 시간을 약간 줍니다.
-
-    print("\n🚀 모든 스크립트가 성공적으로 시작되었습니다!")
-    print("종료하려면 Ctrl+C를 누르세요.")
-
-    # 모든 서브 프로세스가 종료될 때까지 기다리거나, 메인 스크립트를 계속 실행
-    # 여기서는 Ctrl+C로 종료할 때까지 대기하도록 함
-    while True:
-        time.sleep(1)
-
-except KeyboardInterrupt:
-    print("\nCtrl+C가 감지되었습니다. 모든 스크립트를 종료합니다...")
-    for process in processes:
-        if process.poll() is None: # 아직 실행 중인 프로세스인 경우
-            process.terminate() # 프로세스에 종료 신호를 보냄 (Graceful termination)
-            print(f"❌ 프로세스 {script_name} 종료 신호 전송.")
-    
-    # 프로세스들이 완전히 종료될 때까지 기다림 (선택 사항)
-    for process in processes:
-        try:
-            process.wait(timeout=5) # 최대 5초 대기
-        except subprocess.TimeoutExpired:
-            print(f"⚠️ 프로세스 {process.args[2]}가 응답하지 않아 강제 종료합니다.")
-            process.kill() # 강제 종료
-            
-finally:
-    print("모든 스크립트 종료 및 정리 완료.")
+import subprocess
+import time
+import os
+import urllib.request
+
+from camera_broker import CAMERA_SHM_NAME
+from event_bus import BUS_DIR
+
+# 자식 프로세스의 명령 전송 방식. 기본은 같은 장비 안에서 이벤트 버스("bus"), "http"이면 버스 브리지를 띄우지 않습니다.
+COMMAND_TRANSPORT = os.environ.get("COMMAND_TRANSPORT", "bus")
+
+# --- 서비스 정의 ---
+# 목록 순서대로 시작하며, 각 서비스가 준비(ready)된 뒤에 다음 서비스를 시작합니다.
+# - ready_url: 200 응답이 오면 준비 완료 / ready_file: 파일이 생기면 준비 완료 / 둘 다 없으면 시작 즉시 준비
+# - cpus: 고정할 CPU 코어 (라즈베리 파이 4는 0~3). 제스처와 YOLO가 같은 코어를 두고 다투지 않게 나눕니다.
+# - depends_on: 이 서비스들이 재시작되면 함께 재시작하고, 이 서비스들이 준비된 뒤에만 (재)시작합니다.
+SERVICES = [
+    {
+        "name": "camera_broker",
+        "script": "camera_broker.py",  # 카메라를 한 번만 열어 공유 메모리로 프레임 배포
+        "cpus": [0],
+        "ready_file": f"/dev/shm/{CAMERA_SHM_NAME}",
+    },
+    {
+        "name": "gpio_server",
+        "script": "gpio_server.py",
+        "cpus": [0],
+        "ready_url": "http://localhost:5000/",
+    },
+    {
+        "name": "bus_bridge",
+        "script": "event_bus.py",  # 버스 메시지를 Ubuntu PC 스피커 서버(SPEAKER_URL)로 HTTP 전달
+        "cpus": [0],
+        "ready_file": os.path.join(BUS_DIR, "bridge_speaker.sock"),
+        "enabled": COMMAND_TRANSPORT == "bus",
+    },
+    {
+        "name": "gesture",
+        "script": "gesture_debounce_success.py",  # 제스처 인식 코드
+        "cpus": [1, 2],
+        "ready_url": "http://localhost:9101/metrics",
+        "depends_on": ["camera_broker"],
+    },
+    {
+        "name": "person_detector",
+        "script": "human_detect_buzzer.py",  # 따로 실행하던 사람 감지 (SUPERVISE_PERSON_DETECTOR=1이면 함께 관리)
+        "cpus": [3],
+        "ready_url": "http://localhost:9102/metrics",
+        "depends_on": ["camera_broker"],
+        "enabled": os.environ.get("SUPERVISE_PERSON_DETECTOR") == "1",
+    },
+]
+
+READY_TIMEOUT = 60.0  # 준비 대기 최대 시간 (초)
+RESTART_BACKOFF_BASE = 1.0  # 재시작 대기: 1, 2, 4, 8 ... 초
+RESTART_BACKOFF_MAX = 30.0
+STABLE_RUN_TIME = 60.0  # 이 시간 이상 살아 있었으면 재시작 횟수를 초기화
+
+# 비전 스크립트들이 카메라를 직접 열지 않고 브로커 프레임을 공유하고,
+# 같은 장비 안의 명령은 COMMAND_TRANSPORT(기본: 이벤트 버스)로 전달하도록 설정
+child_env = dict(os.environ)
+child_env.setdefault("CAMERA_SOURCE", "broker")
+child_env["COMMAND_TRANSPORT"] = COMMAND_TRANSPORT
+
+
+def is_ready(service):
+    if "ready_url" in service:
+        try:
+            with urllib.request.urlopen(service["ready_url"], timeout=0.5) as res:
+                return res.status == 200
+        except OSError:
+            return False
+    if "ready_file" in service:
+        return os.path.exists(service["ready_file"])
+    return True
+
+
+def start_service(service):
+    cpus = service.get("cpus")
+    available = os.sched_getaffinity(0) if hasattr(os, "sched_getaffinity") else None
+    cpus = [c for c in cpus if c in available] if cpus and available else None
+
+    def pin_cpus():
+        os.sched_setaffinity(0, cpus)
+
+    # 비정상 종료한 이전 실행이 남긴 준비 파일(공유 메모리, 소켓)로 시작 전에 준비 완료로 판정하지 않게 지웁니다.
+    if "ready_file" in service:
+        try:
+            os.unlink(service["ready_file"])
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"⚠️ {service['name']} 이전 준비 파일을 지우지 못했습니다:", e)
+
+    print(f"✅ {service['name']} 시작 중... ({service['script']}, CPU {cpus or '제한 없음'})")
+    # '-u' 옵션은 버퍼링 없이 즉시 표준 출력을 표시하게 합니다 (디버깅에 유용).
+    service["process"] = subprocess.Popen(
+        ['python3', '-u', service["script"]], env=child_env, preexec_fn=pin_cpus if cpus else None
+    )
+    service["started_at"] = time.time()
+
+
+def wait_ready(service):
+    """준비될 때까지 폴링합니다. 도중에 프로세스가 죽으면 False."""
+    deadline = time.time() + READY_TIMEOUT
+    while time.time() < deadline:
+        if service["process"].poll() is not None:
+            return False
+        if is_ready(service):
+            print(f"🟢 {service['name']} 준비 완료 ({time.time() - service['started_at']:.2f}초)")
+            return True
+        time.sleep(0.1)
+    print(f"⚠️ {service['name']} 준비 확인 시간 초과 ({READY_TIMEOUT:.0f}초). 계속 진행합니다.")
+    return True
+
+
+def stop_process(service):
+    process = service.get("process")
+    if process is None:
+        return
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            print(f"⚠️ 프로세스 {service['name']}가 응답하지 않아 강제 종료합니다.")
+            process.kill()
+            process.wait()
+
+
+def restart_dependents(services, name, now):
+    """name 서비스를 재시작할 때, 그 서비스에 의존하는 서비스도 멈추고 다시 시작하도록 예약합니다.
+
+    (예: 카메라 브로커가 새 공유 메모리를 만들면 제스처/사람 감지도 새로 붙어야 합니다.)
+    """
+    for service in services:
+        if name in service.get("depends_on", ()) and service["process"] is not None:
+            print(f"🔁 {name} 재시작에 따라 {service['name']}도 재시작합니다.")
+            stop_process(service)
+            service["process"] = None
+            service["restart_at"] = now  # 의존 서비스 때문이므로 백오프를 늘리지 않습니다.
+
+
+def dependencies_ready(services, service):
+    by_name = {s["name"]: s for s in services}
+    for name in service.get("depends_on", ()):
+        dep = by_name.get(name)
+        if dep is None:
+            continue  # 비활성화된 서비스
+        if dep["process"] is None or dep["process"].poll() is not None or not is_ready(dep):
+            return False
+    return True
+
+
+def supervise(services):
+    """죽은 서비스를 지수 백오프로 다시 시작합니다."""
+    while True:
+        now = time.time()
+        for service in services:
+            process = service["process"]
+            if process is not None and process.poll() is not None:
+                run_time = now - service["started_at"]
+                if run_time >= STABLE_RUN_TIME:
+                    service["restarts"] = 0
+                delay = min(RESTART_BACKOFF_BASE * (2 ** service["restarts"]), RESTART_BACKOFF_MAX)
+                print(f"💥 {service['name']} 종료됨 (코드 {process.returncode}, {run_time:.1f}초 실행). "
+                      f"{delay:.0f}초 후 재시작합니다.")
+                service["process"] = None
+                service["restart_at"] = now + delay
+                service["restarts"] += 1
+            elif process is None and now >= service["restart_at"] and dependencies_ready(services, service):
+                restart_dependents(services, service["name"], now)
+                start_service(service)
+        time.sleep(0.5)
+
+
+def stop_services(services):
+    # 시작의 역순으로 종료 신호를 보냅니다.
+    for service in reversed(services):
+        process = service.get("process")
+        if process is not None and process.poll() is None: # 아직 실행 중인 프로세스인 경우
+            process.terminate() # 프로세스에 종료 신호를 보냄 (Graceful termination)
+            print(f"❌ 프로세스 {service['name']} 종료 신호 전송.")
+
+    # 프로세스들이 완전히 종료될 때까지 기다림
+    for service in reversed(services):
+        process = service.get("process")
+        if process is None:
+            continue
+        try:
+            process.wait(timeout=5) # 최대 5초 대기
+        except subprocess.TimeoutExpired:
+            print(f"⚠️ 프로세스 {service['name']}가 응답하지 않아 강제 종료합니다.")
+            process.kill() # 강제 종료
+
+
+if __name__ == "__main__":
+    services = [dict(s, process=None, restarts=0, restart_at=0.0) for s in SERVICES if s.get("enabled", True)]
+    # 비활성화된 서비스에는 의존하지 않습니다.
+    names = {s["name"] for s in services}
+    for service in services:
+        service["depends_on"] = [name for name in service.get("depends_on", ()) if name in names]
+
+    print("모든 프로젝트 스크립트를 시작합니다...")
+    boot_start = time.time()
+    try:
+        for service in services:
+            start_service(service)
+            if not wait_ready(service):
+                print(f"❌ {service['name']}가 준비 전에 종료되었습니다. 감시 루프에서 재시작합니다.")
+
+        print(f"\n🚀 모든 스크립트가 시작되었습니다! (총 {time.time() - boot_start:.2f}초)")
+        print("종료하려면 Ctrl+C를 누르세요.")
+        supervise(services)
+
+    except KeyboardInterrupt:
+        print("\nCtrl+C가 감지되었습니다. 모든 스크립트를 종료합니다...")
+
+    finally:
+        stop_services(services)
+        print("모든 스크립트 종료 및 정리 완료.")
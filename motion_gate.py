@@ -0,0 +1,69 @@
+import cv2
+import numpy as np
+
+
+# --- 저해상도 프레임 차분 기반 움직임 감지 ---
+class MotionGate:
+    """프레임을 작게 줄인 흑백 이미지로 직전 프레임과 비교해 움직임 정도(0~1)를 계산합니다.
+
+    반환값은 변화한 픽셀 비율이며, 순간적인 움직임을 놓치지 않도록 decay로 서서히 줄어드는
+    '최근 움직임' 값도 함께 유지합니다.
+    """
+
+    def __init__(self, size=(80, 60), pixel_threshold=25, decay=0.9):
+        self.size = size
+        self.pixel_threshold = pixel_threshold
+        self.decay = decay
+        self.recent_motion = 1.0  # 시작 직후에는 움직임이 있다고 보고 한 번은 추론합니다.
+        self._small = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        self._gray = np.empty((size[1], size[0]), dtype=np.uint8)
+        self._prev = None
+        self._diff = np.empty_like(self._gray)
+
+    def update(self, frame):
+        cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        if self._prev is None:
+            self._prev = self._gray.copy()
+            return self.recent_motion
+
+        cv2.absdiff(self._gray, self._prev, dst=self._diff)
+        self._prev, self._gray = self._gray, self._prev
+        motion = np.count_nonzero(self._diff > self.pixel_threshold) / self._diff.size
+        self.recent_motion = max(motion, self.recent_motion * self.decay)
+        return self.recent_motion
+
+
+# 마지막으로 사람을 감지한 뒤 이 시간(초) 동안은 사람이 보이는 중으로 봅니다.
+PERSON_SEEN_TIMEOUT = 2.0
+
+
+# --- 움직임/감지 상태에 따른 추론 간격 조절 ---
+class AdaptiveInterval:
+    """사람이 보이거나 움직임이 크면 촘촘하게, 방이 비어 있으면 드물게 추론합니다.
+
+    - 사람이 보이는 중이거나 움직임 >= high_motion: dense 프레임마다
+    - low_motion <= 움직임 < high_motion: sparse 프레임마다
+    - 움직임 < low_motion 이고 사람도 없음: 추론하지 않음 (정지 장면)
+    """
+
+    def __init__(self, dense=3, sparse=15, low_motion=0.002, high_motion=0.02):
+        self.dense = dense
+        self.sparse = sparse
+        self.low_motion = low_motion
+        self.high_motion = high_motion
+        self.frames_since_inference = 0
+
+    def should_infer(self, motion, person_visible):
+        self.frames_since_inference += 1
+        if person_visible or motion >= self.high_motion:
+            interval = self.dense
+        elif motion >= self.low_motion:
+            interval = self.sparse
+        else:
+            return False
+
+        if self.frames_since_inference >= interval:
+            self.frames_since_inference = 0
+            return True
+        return False
@@ -0,0 +1,78 @@
+import json
+import os
+import re
+
+import requests
+
+OLLAMA_URL = os.environ.get("OLLAMA_URL", "http://localhost:11434/api/generate")
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "gemma3:1b")
+KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")  # 요청 사이에 모델을 메모리에 유지
+
+INTENT_PATTERN = re.compile(r"\b(light_on|light_off|motor_on|motor_off)\b")
+
+
+# --- 스트리밍 의도 추출 클라이언트 ---
+class OllamaIntentClient:
+    """Ollama /api/generate를 스트리밍으로 호출해, 의도 토큰이 나오는 즉시 생성을 중단합니다.
+
+    - num_predict로 생성 길이를 제한하고, 내용이 나온 뒤의 줄바꿈에서 멈춥니다.
+      (서버 쪽 stop ["\n"]은 모델이 줄바꿈부터 생성하면 빈 응답으로 끝나므로 클라이언트에서 판단합니다.)
+    - keep_alive로 모델을 상주시키고, 고정된 few-shot 프롬프트를 항상 같은 접두부로 보내
+      서버의 KV 캐시가 접두부 평가를 재사용하도록 합니다.
+    """
+
+    def __init__(self, prompt_prefix, url=OLLAMA_URL, model=OLLAMA_MODEL, keep_alive=KEEP_ALIVE,
+                 num_predict=8, timeout=(2.0, 30.0)):
+        self.prompt_prefix = prompt_prefix
+        self.url = url
+        self.model = model
+        self.keep_alive = keep_alive
+        self.num_predict = num_predict
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def build_prompt(self, text):
+        return f"""{self.prompt_prefix}
+문장: "{text}"
+정답:"""
+
+    def _payload(self, prompt, num_predict):
+        return {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True,
+            "keep_alive": self.keep_alive,
+            "options": {"num_predict": num_predict, "temperature": 0},
+        }
+
+    def ask(self, text):
+        """의도 문자열을 반환합니다. 의도를 찾지 못하면 생성된 원문(첫 줄)을 그대로 반환합니다.
+
+        연결 오류는 requests.RequestException, 깨진 스트림 줄은 ValueError(json.JSONDecodeError)로 전달됩니다.
+        """
+        generated = ""
+        with self.session.post(
+            self.url, json=self._payload(self.build_prompt(text), self.num_predict),
+            stream=True, timeout=self.timeout,
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                generated += chunk.get("response", "")
+                match = INTENT_PATTERN.search(generated)
+                if match:
+                    # 응답을 닫으면 연결이 끊기고 Ollama도 남은 생성을 중단합니다.
+                    return match.group(1)
+                if chunk.get("done") or "\n" in generated.lstrip():
+                    break
+        return generated.strip().split("\n", 1)[0].strip()
+
+    def warmup(self):
+        """모델을 미리 올리고 few-shot 접두부를 한 번 평가해 둡니다."""
+        try:
+            self.ask("")
+            print(f"🔥 Ollama 모델 준비 완료 ({self.model})")
+        except (requests.RequestException, ValueError) as e:
+            print("❌ Ollama 예열 실패:", e)
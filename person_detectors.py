@@ -0,0 +1,175 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+PERSON_CLASS_ID = 0  # COCO 'person' 클래스
+# 추론 백엔드에서 사용할 CPU 스레드 수 (제스처 프로세스와 코어를 나눠 쓰므로 기본 1)
+NUM_THREADS = int(os.environ.get("PERSON_NUM_THREADS", "1"))
+
+
+# --- Ultralytics(PyTorch) 백엔드 ---
+class UltralyticsDetector:
+    """기존 방식: ultralytics YOLO(.pt)를 PyTorch로 실행합니다. 전처리/후처리는 프레임워크가 담당합니다."""
+
+    name = "ultralytics"
+
+    def __init__(self, model_path="yolov5n.pt", input_size=640, conf=0.5):
+        from ultralytics import YOLO
+
+        self.model = YOLO(model_path)
+        self.input_size = input_size
+        self.conf = conf
+
+    def detect(self, frame):
+        """[(x1, y1, x2, y2, score), ...]를 신뢰도 높은 순으로 반환합니다."""
+        result = self.model.predict(
+            frame, conf=self.conf, imgsz=self.input_size, verbose=False, classes=[PERSON_CLASS_ID]
+        )[0]
+        boxes = result.boxes.xyxy.cpu().numpy()
+        scores = result.boxes.conf.cpu().numpy()
+        order = np.argsort(-scores)
+        return [(*map(int, boxes[i]), float(scores[i])) for i in order]
+
+    def warmup(self, frame_size=(640, 480)):
+        """빈 프레임으로 한 번 추론해 모델 퓨즈/첫 호출 비용을 미리 치릅니다."""
+        width, height = frame_size
+        self.detect(np.zeros((height, width, 3), dtype=np.uint8))
+
+
+# --- ONNX Runtime 백엔드 ---
+class OnnxDetector:
+    """ultralytics에서 ONNX로 내보낸 YOLO 모델을 onnxruntime CPU로 실행합니다. (PyTorch 불필요)
+
+    레터박스/정규화는 미리 할당한 버퍼에서 처리하고, 후처리는 person 클래스만 NumPy로 NMS합니다.
+    YOLOv5 형식(1, N, 5 + 클래스 수, objectness 포함)과 YOLOv8/v5u 형식(1, 4 + 클래스 수, N) 출력을 모두 지원합니다.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path="yolov5nu.onnx", input_size=None, conf=0.5, iou=0.45, num_threads=NUM_THREADS):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        _, _, height, width = self.session.get_inputs()[0].shape
+        # 입력 크기가 고정된 모델은 그 크기를, 동적 입력 모델은 input_size(기본 320)를 사용합니다.
+        if isinstance(height, int) and isinstance(width, int):
+            self.input_size = (width, height)
+        else:
+            size = input_size or 320
+            self.input_size = (size, size)
+        self.conf = conf
+        self.iou = iou
+
+        width, height = self.input_size
+        self._input = np.empty((1, 3, height, width), dtype=np.float32)
+        self._resized = None  # 레터박스 안쪽 영역 크기의 uint8 버퍼 (프레임 크기가 바뀔 때만 새로 할당)
+        self._letterbox = None  # (프레임 크기, 축척, 여백 x, 여백 y)
+
+    def _prepare(self, frame):
+        h, w = frame.shape[:2]
+        if self._letterbox is None or self._letterbox[0] != (w, h):
+            in_w, in_h = self.input_size
+            scale = min(in_w / w, in_h / h)
+            new_w, new_h = int(round(w * scale)), int(round(h * scale))
+            pad_x, pad_y = (in_w - new_w) // 2, (in_h - new_h) // 2
+            self._resized = np.empty((new_h, new_w, 3), dtype=np.uint8)
+            self._input[:] = 114 / 255.0  # 레터박스 회색 여백은 한 번만 채웁니다
+            self._letterbox = ((w, h), scale, pad_x, pad_y)
+        _, scale, pad_x, pad_y = self._letterbox
+
+        # 리사이즈 후 BGR → RGB, HWC → CHW, 0~1 정규화를 한 번의 곱셈으로 입력 버퍼 안쪽 영역에 씁니다.
+        cv2.resize(frame, self._resized.shape[1::-1], dst=self._resized)
+        new_h, new_w = self._resized.shape[:2]
+        np.multiply(
+            self._resized[:, :, ::-1].transpose(2, 0, 1),
+            1.0 / 255.0,
+            out=self._input[0, :, pad_y:pad_y + new_h, pad_x:pad_x + new_w],
+            casting="unsafe",
+        )
+        return scale, pad_x, pad_y
+
+    def detect(self, frame):
+        """[(x1, y1, x2, y2, score), ...]를 신뢰도 높은 순으로 반환합니다."""
+        scale, pad_x, pad_y = self._prepare(frame)
+        out = self.session.run(None, {self.input_name: self._input})[0][0]
+
+        if out.shape[0] < out.shape[1]:
+            # YOLOv8/v5u: (4 + 클래스 수, N), objectness 없음
+            boxes = out[:4].T
+            scores = out[4 + PERSON_CLASS_ID]
+        else:
+            # YOLOv5: (N, 5 + 클래스 수), 점수 = objectness × 클래스 확률
+            boxes = out[:, :4]
+            scores = out[:, 4] * out[:, 5 + PERSON_CLASS_ID]
+
+        keep = scores >= self.conf
+        if not keep.any():
+            return []
+        boxes, scores = boxes[keep], scores[keep]
+
+        # (cx, cy, w, h) 입력 좌표 → 레터박스를 되돌린 원본 프레임 (x1, y1, x2, y2)
+        h, w = frame.shape[:2]
+        xyxy = np.empty_like(boxes)
+        xyxy[:, 0] = (boxes[:, 0] - boxes[:, 2] / 2 - pad_x) / scale
+        xyxy[:, 1] = (boxes[:, 1] - boxes[:, 3] / 2 - pad_y) / scale
+        xyxy[:, 2] = (boxes[:, 0] + boxes[:, 2] / 2 - pad_x) / scale
+        xyxy[:, 3] = (boxes[:, 1] + boxes[:, 3] / 2 - pad_y) / scale
+        xyxy[:, [0, 2]] = xyxy[:, [0, 2]].clip(0, w)
+        xyxy[:, [1, 3]] = xyxy[:, [1, 3]].clip(0, h)
+
+        return [(*map(int, xyxy[i]), float(scores[i])) for i in nms(xyxy, scores, self.iou)]
+
+    def warmup(self, frame_size=(640, 480)):
+        """빈 프레임으로 한 번 추론해 세션의 첫 호출 비용(메모리 할당 등)과 레터박스 버퍼 할당을 미리 치릅니다."""
+        width, height = frame_size
+        self.detect(np.zeros((height, width, 3), dtype=np.uint8))
+
+
+def nms(boxes, scores, iou_threshold):
+    """NumPy NMS. 남길 박스 인덱스를 점수 높은 순으로 반환합니다."""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores)
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.maximum(0.0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        h = np.maximum(0.0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return keep
+
+
+DETECTORS = {
+    UltralyticsDetector.name: UltralyticsDetector,
+    OnnxDetector.name: OnnxDetector,
+}
+
+
+def load_detector(kind, model_path, input_size):
+    """백엔드 이름("ultralytics" / "onnx")으로 사람 검출기를 생성합니다."""
+    if kind not in DETECTORS:
+        raise ValueError(f"알 수 없는 사람 감지 백엔드: {kind} (사용 가능: {', '.join(DETECTORS)})")
+    return DETECTORS[kind](model_path, input_size=input_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="YOLO(.pt) → ONNX 변환 (onnx 백엔드용)")
+    parser.add_argument("--model", default="yolov5n.pt")
+    parser.add_argument("--imgsz", type=int, default=320)
+    args = parser.parse_args()
+
+    from ultralytics import YOLO
+
+    path = YOLO(args.model).export(format="onnx", imgsz=args.imgsz, simplify=True)
+    print(f"✅ ONNX 변환 완료: {path} (입력 {args.imgsz}x{args.imgsz})")
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+BOUNDARY = "frame"
+
+
+def is_headless():
+    """HEADLESS=1이면 화면 출력을 끕니다. 지정하지 않으면 DISPLAY가 없을 때 자동으로 헤드리스입니다."""
+    value = os.environ.get("HEADLESS", "auto")
+    if value == "auto":
+        return not os.environ.get("DISPLAY")
+    return value == "1"
+
+
+# --- 저주기 MJPEG 미리보기 ---
+class PreviewServer:
+    """접속한 클라이언트가 있을 때만 낮은 주기로 오버레이를 그리고 JPEG로 인코딩해 스트리밍합니다.
+
+    프레임 루프는 publish()만 호출하며, 클라이언트가 없거나 다음 전송 시각이 아니면 바로 반환합니다.
+    그리기와 인코딩은 백그라운드 스레드에서 처리합니다.
+    브라우저에서 http://<장치 IP>:<port>/ 로 확인합니다.
+    """
+
+    def __init__(self, port, fps=5, quality=70):
+        self.port = port
+        self.interval = 1.0 / fps
+        self.quality = quality
+        self.clients = 0
+        self._clients_lock = threading.Lock()
+        self._next_time = 0.0
+        self._pending = None
+        self._pending_event = threading.Event()
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self._jpeg_cond = threading.Condition()
+        self._server = None
+
+    def start(self):
+        preview = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/":
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/html; charset=utf-8")
+                    self.end_headers()
+                    self.wfile.write(b'<html><body style="margin:0"><img src="/stream"></body></html>')
+                elif self.path == "/stream":
+                    preview._stream(self)
+                else:
+                    self.send_error(404)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("0.0.0.0", self.port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        threading.Thread(target=self._encode_loop, daemon=True).start()
+        print(f"🖥️ 미리보기 서버 시작 (http://0.0.0.0:{self.port}/)")
+        return self
+
+    @property
+    def wants_frame(self):
+        return self.clients > 0 and time.time() >= self._next_time
+
+    def publish(self, frame, overlay=None):
+        """frame과 오버레이 함수(canvas를 받아 그림)를 인코딩 대기열에 넣습니다."""
+        if not self.wants_frame:
+            return
+        self._next_time = time.time() + self.interval
+        # 원본은 곧 덮어써질 수 있으므로(공유 메모리 등) 전송할 프레임만 복사합니다.
+        self._pending = (frame.copy(), overlay)
+        self._pending_event.set()
+
+    def _encode_loop(self):
+        while True:
+            self._pending_event.wait()
+            self._pending_event.clear()
+            canvas, overlay = self._pending
+            if overlay is not None:
+                overlay(canvas)
+            ok, jpeg = cv2.imencode(".jpg", canvas, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+            if not ok:
+                continue
+            with self._jpeg_cond:
+                self._jpeg = jpeg.tobytes()
+                self._jpeg_seq += 1
+                self._jpeg_cond.notify_all()
+
+    def _stream(self, handler):
+        handler.send_response(200)
+        handler.send_header("Content-Type", f"multipart/x-mixed-replace; boundary={BOUNDARY}")
+        handler.end_headers()
+        with self._clients_lock:
+            self.clients += 1
+        last_seq = self._jpeg_seq
+        try:
+            while True:
+                with self._jpeg_cond:
+                    self._jpeg_cond.wait_for(lambda: self._jpeg_seq != last_seq, timeout=5.0)
+                    if self._jpeg_seq == last_seq:
+                        continue
+                    jpeg, last_seq = self._jpeg, self._jpeg_seq
+                handler.wfile.write(
+                    f"--{BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {len(jpeg)}\r\n\r\n".encode()
+                )
+                handler.wfile.write(jpeg)
+                handler.wfile.write(b"\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            with self._clients_lock:
+                self.clients -= 1
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
@@ -0,0 +1,137 @@
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from export_tflite import convert_float16
+from gesture_backends import NUM_THREADS, TFLiteBackend
+from train_gesture import add_common_args, build_model, load_training_data, make_pipelines, setup, train
+
+
+# ------------------------------------------
+# 📌 고정 스레드 CPU 지연 측정
+# ------------------------------------------
+def measure_latency(tflite_path, num_threads, runs=100, warmup=10):
+    """이미지 한 장 추론 시간을 반복 측정합니다. (배포와 같은 TFLite 백엔드, 스레드 수 고정)"""
+    backend = TFLiteBackend(tflite_path, num_threads=num_threads)
+    width, height = backend.input_size
+    batch = np.zeros((1, height, width, 3), dtype=backend.input_dtype)
+    for _ in range(warmup):
+        backend.predict_raw(batch)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict_raw(batch)
+        samples.append(time.perf_counter() - start)
+    ms = np.array(samples) * 1000.0
+    return round(float(np.percentile(ms, 50)), 3), round(float(np.percentile(ms, 95)), 3)
+
+
+def pareto_front(results):
+    """정확도는 높고 지연은 낮은 쪽이 좋습니다. 다른 변형에 완전히 밀리지 않는 것만 남깁니다."""
+    front = []
+    for r in results:
+        dominated = any(
+            o["val_accuracy"] >= r["val_accuracy"]
+            and o["latency_p50_ms"] <= r["latency_p50_ms"]
+            and (o["val_accuracy"] > r["val_accuracy"] or o["latency_p50_ms"] < r["latency_p50_ms"])
+            for o in results
+        )
+        if not dominated:
+            front.append(r["name"])
+    return front
+
+
+def select_model(results, min_accuracy):
+    """정확도 기준을 넘는 변형 중 가장 빠른 것. 없으면 None."""
+    passing = [r for r in results if r["val_accuracy"] >= min_accuracy]
+    if not passing:
+        return None
+    return min(passing, key=lambda r: r["latency_p50_ms"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="입력 크기/alpha/헤드 조합별 정확도-지연 측정")
+    add_common_args(parser)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[96, 128, 160])
+    parser.add_argument("--alphas", type=float, nargs="+", default=[0.35, 0.5, 1.0])
+    parser.add_argument("--heads", nargs="+", choices=["flatten", "gap"], default=["flatten", "gap"])
+    parser.add_argument("--threads", type=int, default=NUM_THREADS, help="지연 측정 스레드 수 (고정)")
+    parser.add_argument("--min-accuracy", type=float, default=0.95, help="선택 기준 검증 정확도")
+    parser.add_argument("--output-dir", default="sweep_results")
+    parser.add_argument("--output", default=None,
+                        help="선택된 모델을 복사할 경로 (기본: <output-dir>/selected.h5, 배포 모델은 직접 덮어쓰세요)")
+    args = parser.parse_args()
+    if args.output is None:
+        args.output = os.path.join(args.output_dir, "selected.h5")
+
+    dataset_path = setup(args)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    results = []
+    for img_size, alpha, head in itertools.product(args.sizes, args.alphas, args.heads):
+        name = f"s{img_size}_a{alpha:g}_{head}"
+        print(f"\n🔬 {name} 학습 시작")
+        # 변형마다 같은 시드에서 시작해 조합 간 비교가 공정하도록 합니다.
+        tf.keras.backend.clear_session()
+        tf.keras.utils.set_random_seed(args.seed)
+
+        train_ds, val_ds, class_names = load_training_data(dataset_path, args, img_size)
+        train_ds, val_ds = make_pipelines(train_ds, val_ds, args.batch_size, args.seed)
+        model, base_model = build_model(len(class_names), img_size, alpha, head)
+        val_acc = train(model, base_model, train_ds, val_ds, args)
+
+        h5_path = os.path.join(args.output_dir, f"{name}.h5")
+        tflite_path = os.path.join(args.output_dir, f"{name}_fp16.tflite")
+        model.save(h5_path)
+        with open(tflite_path, "wb") as f:
+            f.write(convert_float16(model))
+        p50, p95 = measure_latency(tflite_path, args.threads)
+
+        results.append({
+            "name": name,
+            "img_size": img_size,
+            "alpha": alpha,
+            "head": head,
+            "val_accuracy": round(float(val_acc), 4),
+            "latency_p50_ms": p50,
+            "latency_p95_ms": p95,
+            "params": int(model.count_params()),
+            "h5_mb": round(os.path.getsize(h5_path) / 1e6, 2),
+            "tflite_fp16_mb": round(os.path.getsize(tflite_path) / 1e6, 2),
+            "h5_path": h5_path,
+            "tflite_path": tflite_path,
+        })
+        print(f"📊 {name}: 정확도 {val_acc:.3f}, p50 {p50}ms, TFLite {results[-1]['tflite_fp16_mb']}MB")
+
+    front = pareto_front(results)
+    selected = select_model(results, args.min_accuracy)
+    if selected is not None:
+        shutil.copyfile(selected["h5_path"], args.output)
+
+    print(f"\n{'변형':<20}{'정확도':>8}{'p50(ms)':>10}{'p95(ms)':>10}{'크기(MB)':>10}")
+    for r in sorted(results, key=lambda r: r["latency_p50_ms"]):
+        mark = "★" if selected and r["name"] == selected["name"] else ("●" if r["name"] in front else " ")
+        print(f"{mark} {r['name']:<18}{r['val_accuracy']:>8.3f}{r['latency_p50_ms']:>10}"
+              f"{r['latency_p95_ms']:>10}{r['tflite_fp16_mb']:>10}")
+    print("● 파레토 최적, ★ 선택됨")
+
+    report_path = os.path.join(args.output_dir, "report.json")
+    with open(report_path, "w") as f:
+        json.dump({
+            "threads": args.threads,
+            "min_accuracy": args.min_accuracy,
+            "selected": selected and selected["name"],
+            "pareto_front": front,
+            "variants": results,
+        }, f, indent=2, ensure_ascii=False)
+    if selected is None:
+        print(f"❌ 정확도 {args.min_accuracy:.3f} 이상인 변형이 없어 모델을 복사하지 않았습니다. (보고서: {report_path})")
+        sys.exit(1)
+    print(f"✅ 선택: {selected['name']} → {args.output} (보고서: {report_path})")
@@ -0,0 +1,148 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gesture_decision import NO_HAND, GestureDecision, HandDecisions, TraceRecorder, load_trace, replay  # noqa: E402
+from hand_tracking import HandIdAssigner  # noqa: E402
+
+CLASS_NAMES = ["fan_off", "fan_on", "light_off", "light_on"]
+FPS = 30.0
+
+
+def make_hands():
+    return HandDecisions(lambda: GestureDecision(CLASS_NAMES, hold_time=0.2, cooldown=1.0))
+
+
+def onehot(name, p=0.95):
+    probs = np.full(len(CLASS_NAMES), (1.0 - p) / (len(CLASS_NAMES) - 1), dtype=np.float32)
+    probs[CLASS_NAMES.index(name)] = p
+    return probs
+
+
+def scenario():
+    """프레임별 [(박스, 확률), ...]: 손이 fan_on을 보이고 사라졌다가, 다른 위치에서 새 손으로 light_on을 보입니다."""
+    frames = []
+    left, right = (100, 100, 200, 200), (400, 100, 500, 200)
+    frames += [[(left, onehot("fan_on"))]] * 12
+    frames += [[]] * 8  # 추적이 끝날 만큼 손이 안 보임 (max_missing 5 초과)
+    frames += [[(right, onehot("light_on"))]] * 12  # 쿨다운(1초) 안에 다시 나타남
+    frames += [[]] * 20
+    frames += [[(right, onehot("light_on"))]] * 12  # 쿨다운이 지난 뒤
+    return frames
+
+
+def run_live(frames, trace=None):
+    """gesture_debounce_success.py의 프레임 루프와 같은 순서로 ID 부여 → 기록 → 정리 → 확정을 합니다."""
+    assigner = HandIdAssigner()
+    hands = make_hands()
+    fired = []
+    for i, frame_hands in enumerate(frames):
+        t = i / FPS
+        hand_ids = assigner.assign([box for box, _ in frame_hands])
+        preds = [probs for _, probs in frame_hands]
+        if trace is not None:
+            trace.add_frame(t, hand_ids, preds)
+        hands.prune(assigner.active_ids)
+        for hand_id, probs in zip(hand_ids, preds):
+            gesture = hands.update(hand_id, probs, t)
+            if gesture is not None:
+                fired.append((t, hand_id, gesture))
+    return fired
+
+
+def feed(decision, frames, start=0.0):
+    """[(확률, 프레임 수), ...]를 FPS 간격으로 넣고 [(시각, 확정된 제스처), ...]를 반환합니다."""
+    fired = []
+    t = start
+    for probs, count in frames:
+        for _ in range(count):
+            gesture = decision.update(probs, t)
+            if gesture is not None:
+                fired.append((t, gesture))
+            t += 1.0 / FPS
+    return fired
+
+
+class GestureDecisionTest(unittest.TestCase):
+    def test_enter_threshold(self):
+        # tau가 아주 작으면 평활화 값이 입력과 같아 임계값만 확인할 수 있습니다.
+        decision = GestureDecision(CLASS_NAMES, tau=1e-3, enter_threshold=0.75, hold_time=0.2)
+        self.assertEqual(feed(decision, [(onehot("fan_on", 0.7), 30)]), [])
+        self.assertIsNone(decision.candidate)
+        decision.update(onehot("fan_on", 0.8), 2.0)
+        self.assertEqual(decision.candidate, "fan_on")
+
+    def test_exit_hysteresis(self):
+        decision = GestureDecision(CLASS_NAMES, tau=1e-3, enter_threshold=0.75, exit_threshold=0.5, hold_time=10.0)
+        decision.update(onehot("light_on", 0.8), 0.0)
+        # 진입 임계값 아래라도 해제 임계값 위면 후보를 유지합니다.
+        decision.update(onehot("light_on", 0.6), 0.1)
+        self.assertEqual(decision.candidate, "light_on")
+        decision.update(onehot("light_on", 0.4), 0.2)
+        self.assertIsNone(decision.candidate)
+
+    def test_per_gesture_enter_threshold(self):
+        decision = GestureDecision(CLASS_NAMES, tau=1e-3, enter_threshold={"fan_on": 0.9}, hold_time=0.2)
+        decision.update(onehot("fan_on", 0.85), 0.0)
+        self.assertIsNone(decision.candidate)  # fan_on만 0.9 필요
+        decision.update(onehot("light_on", 0.85), 0.1)
+        self.assertEqual(decision.candidate, "light_on")  # 나머지는 기본값 0.75
+
+    def test_fires_once_after_hold(self):
+        decision = GestureDecision(CLASS_NAMES, hold_time=0.35, cooldown=0.0)
+        fired = feed(decision, [(onehot("fan_off"), 60)])
+        self.assertEqual([g for _, g in fired], ["fan_off"])
+        self.assertGreaterEqual(fired[0][0], 0.35)
+
+    def test_noisy_frame_does_not_reset_hold(self):
+        clean = feed(GestureDecision(CLASS_NAMES, hold_time=0.35), [(onehot("fan_on"), 30)])
+        noisy = feed(
+            GestureDecision(CLASS_NAMES, hold_time=0.35),
+            [(onehot("fan_on"), 8), (onehot("light_off"), 1), (onehot("fan_on"), 21)],
+        )
+        self.assertEqual(noisy, clean)
+
+    def test_noisy_frame_does_not_retrigger(self):
+        # 확정 뒤 쿨다운이 지나도, 노이즈 한 프레임으로 같은 제스처가 다시 확정되지 않습니다.
+        decision = GestureDecision(CLASS_NAMES, hold_time=0.2, cooldown=0.1)
+        fired = feed(decision, [(onehot("fan_on"), 20), (onehot("light_off"), 1), (onehot("fan_on"), 40)])
+        self.assertEqual([g for _, g in fired], ["fan_on"])
+
+
+class TraceReplayTest(unittest.TestCase):
+    def test_replay_matches_live_loop(self):
+        trace = TraceRecorder(CLASS_NAMES)
+        live = run_live(scenario(), trace)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "trace.npz")
+            trace.save(path)
+            times, hand_ids, probs, class_names = load_trace(path)
+        self.assertEqual(class_names, CLASS_NAMES)
+        self.assertEqual(replay(make_hands(), times, hand_ids, probs), live)
+        self.assertEqual([g for _, _, g in live], ["fan_on", "light_on"])
+
+    def test_cooldown_survives_expired_track(self):
+        live = run_live(scenario())
+        first, second = live
+        # 새 ID로 나타난 손도 첫 확정의 쿨다운이 끝난 뒤에만 확정됩니다.
+        self.assertNotEqual(first[1], second[1])
+        self.assertGreaterEqual(second[0] - first[0], 1.0)
+
+    def test_loads_single_hand_trace_without_hand_ids(self):
+        times = np.arange(20) / FPS
+        probs = np.stack([onehot("fan_off")] * 15 + [np.full(len(CLASS_NAMES), np.nan, np.float32)] * 5)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "old.npz")
+            np.savez_compressed(path, t=times, probs=probs, class_names=np.array(CLASS_NAMES))
+            times, hand_ids, probs, _ = load_trace(path)
+        self.assertEqual(list(hand_ids), [0] * 15 + [NO_HAND] * 5)
+        self.assertEqual([g for _, _, g in replay(make_hands(), times, hand_ids, probs)], ["fan_off"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,331 @@
+import argparse
+import hashlib
+import json
+import os
+import zipfile
+import zlib
+
+import tensorflow as tf
+from tensorflow.keras.applications import MobileNetV2
+from tensorflow.keras.layers import (
+    Conv2D,
+    BatchNormalization,
+    MaxPooling2D,
+    Flatten,
+    Dense,
+    Dropout,
+    GlobalAveragePooling2D,
+)
+from tensorflow.keras.models import Model
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
+from tensorflow.keras.preprocessing import image_dataset_from_directory
+
+from dataset_capture import list_shards, load_shard
+
+AUTOTUNE = tf.data.AUTOTUNE
+VALIDATION_SPLIT = 0.2  # 이미지 폴더 데이터셋의 검증용 비율
+
+
+# ------------------------------------------
+# 📌 모델 (train_image.py와 같은 구조 + 설정 가능)
+# ------------------------------------------
+def build_model(num_classes, img_size=128, alpha=1.0, head="flatten"):
+    """MobileNetV2 + CNN 블록 + 분류 헤드. head: "flatten"(기존) 또는 "gap"."""
+    base_model = MobileNetV2(
+        weights="imagenet", include_top=False, input_shape=(img_size, img_size, 3), alpha=alpha
+    )
+    base_model.trainable = False  # 전이학습 초기엔 freeze
+
+    x = base_model.output
+    x = Conv2D(256, (3, 3), activation="relu", padding="same")(x)
+    x = BatchNormalization()(x)
+    # 입력이 작으면 특징 맵이 1x1까지 줄어들 수 있으므로 그때는 풀링을 생략합니다.
+    if x.shape[1] >= 2:
+        x = MaxPooling2D()(x)
+
+    x = Conv2D(128, (3, 3), activation="relu", padding="same")(x)
+    x = BatchNormalization()(x)
+    if x.shape[1] >= 2:
+        x = MaxPooling2D()(x)
+
+    x = Flatten()(x) if head == "flatten" else GlobalAveragePooling2D()(x)
+    x = Dense(128, activation="relu")(x)
+    x = Dropout(0.5)(x)
+    # mixed precision에서도 softmax 출력은 float32로 계산합니다.
+    output = Dense(num_classes, activation="softmax", dtype="float32")(x)
+
+    return Model(inputs=base_model.input, outputs=output), base_model
+
+
+def unfreeze_top(base_model, num_layers):
+    """MobileNetV2 상위 num_layers개 층만 학습 가능하게 합니다. (BatchNorm 통계는 고정)"""
+    base_model.trainable = True
+    for layer in base_model.layers[:-num_layers]:
+        layer.trainable = False
+    for layer in base_model.layers[-num_layers:]:
+        if isinstance(layer, BatchNormalization):
+            layer.trainable = False
+
+
+# ------------------------------------------
+# 📌 디코딩 결과 캐시 (샤드 단위 저장)
+# ------------------------------------------
+def dataset_fingerprint(dataset_path, img_size, seed, validation_split=VALIDATION_SPLIT):
+    """파일 목록/크기/수정 시각, 이미지 크기, 학습/검증 분할(시드, 비율)로 캐시 키를 만듭니다.
+
+    캐시에는 분할된 결과가 저장되므로, --seed를 바꾸면 다른 캐시를 만들어 새 분할을 씁니다.
+    """
+    h = hashlib.sha1(f"{os.path.abspath(dataset_path)}:{img_size}:{seed}:{validation_split}".encode())
+    for root, _, files in sorted(os.walk(dataset_path)):
+        for name in sorted(files):
+            st = os.stat(os.path.join(root, name))
+            h.update(f"{os.path.relpath(os.path.join(root, name), dataset_path)}:{st.st_size}:{st.st_mtime_ns}".encode())
+    return h.hexdigest()[:16]
+
+
+def build_cache(dataset_path, cache_path, img_size, seed, num_shards):
+    """JPEG를 한 번만 디코딩/리사이즈해 uint8 텐서로 샤드 저장합니다. (증강 전 데이터)"""
+    class_names = None
+    for subset in ("training", "validation"):
+        ds = image_dataset_from_directory(
+            dataset_path,
+            validation_split=VALIDATION_SPLIT,
+            subset=subset,
+            seed=seed,
+            image_size=(img_size, img_size),
+            batch_size=None,
+            label_mode="categorical",
+        )
+        class_names = ds.class_names
+        ds = ds.map(lambda x, y: (tf.cast(x, tf.uint8), y), num_parallel_calls=AUTOTUNE)
+        # (순번, (이미지, 라벨))로 저장해 순번 기준으로 num_shards개 파일에 나눠 씁니다.
+        ds.enumerate().save(
+            os.path.join(cache_path, subset),
+            shard_func=lambda i, xy: i % num_shards,
+        )
+    # meta.json은 마지막에 써서, 중간에 중단된 캐시는 다음 실행 때 다시 만들어지게 합니다.
+    with open(os.path.join(cache_path, "meta.json"), "w") as f:
+        json.dump({
+            "class_names": class_names, "img_size": img_size, "seed": seed, "validation_split": VALIDATION_SPLIT,
+        }, f)
+
+
+def _load_subset(cache_path, subset):
+    return tf.data.Dataset.load(os.path.join(cache_path, subset)).map(lambda i, xy: xy)
+
+
+def load_cached(dataset_path, cache_dir, img_size, seed, num_shards=8):
+    cache_path = os.path.join(cache_dir, dataset_fingerprint(dataset_path, img_size, seed))
+    if not os.path.exists(os.path.join(cache_path, "meta.json")):
+        print(f"🗂️ 디코딩 캐시 생성 중: {cache_path}")
+        build_cache(dataset_path, cache_path, img_size, seed, num_shards)
+    else:
+        print(f"🗂️ 디코딩 캐시 사용: {cache_path}")
+    with open(os.path.join(cache_path, "meta.json")) as f:
+        meta = json.load(f)
+    return _load_subset(cache_path, "training"), _load_subset(cache_path, "validation"), meta["class_names"]
+
+
+# ------------------------------------------
+# 📌 실시간 캡처 샤드 (dataset_capture.py)
+# ------------------------------------------
+def _shard_subset(path):
+    """샤드 파일 이름 해시로 약 20%를 검증용으로 나눕니다. (연속 프레임이 학습/검증에 섞이지 않도록 샤드 단위)"""
+    return "validation" if zlib.crc32(os.path.basename(path).encode()) % 5 == 0 else "training"
+
+
+def _capture_samples(paths, class_names, pseudo_label_threshold, hard_negative_repeat):
+    """샤드에서 (이미지, one-hot 라벨)을 꺼냅니다.
+
+    라벨이 없는 샘플은 pseudo_label_threshold가 주어졌고 어려운 샘플이 아니며 확률이 충분히 높을 때만 예측을 라벨로 씁니다.
+    라벨이 있는 어려운 샘플은 hard_negative_repeat번 반복해 더 자주 학습합니다.
+    """
+    eye = tf.keras.utils.to_categorical(range(len(class_names)), len(class_names))
+    for path in paths:
+        shard = load_shard(path)
+        # 캡처 당시 클래스 순서가 달라도 이름으로 맞춥니다. (모르는 클래스는 건너뜀)
+        remap = [class_names.index(str(c)) if str(c) in class_names else -1 for c in shard["class_names"]]
+        for image, probs, label, flags in zip(shard["images"], shard["probs"], shard["labels"], shard["flags"]):
+            if label < 0:
+                if pseudo_label_threshold is None or flags or probs.max() < pseudo_label_threshold:
+                    continue
+                label = probs.argmax()
+            target = remap[label]
+            if target < 0:
+                continue
+            for _ in range(hard_negative_repeat if flags else 1):
+                yield image, eye[target]
+
+
+def load_capture_shards(capture_dirs, class_names, img_size, pseudo_label_threshold=None, hard_negative_repeat=2):
+    """캡처 샤드를 JPEG 디코딩 없이 바로 (train_ds, val_ds, class_names)로 읽습니다."""
+    paths = [path for capture_dir in capture_dirs for path in list_shards(capture_dir)]
+    if not paths:
+        raise FileNotFoundError(f"캡처 샤드가 없습니다: {', '.join(capture_dirs)}")
+    if class_names is None:
+        class_names = [str(c) for c in load_shard(paths[0])["class_names"]]
+    print(f"📦 캡처 샤드 {len(paths)}개 사용: {', '.join(capture_dirs)}")
+
+    signature = (
+        tf.TensorSpec((None, None, 3), tf.uint8),
+        tf.TensorSpec((len(class_names),), tf.float32),
+    )
+
+    def subset(name, repeat):
+        files = [path for path in paths if _shard_subset(path) == name]
+        ds = tf.data.Dataset.from_generator(
+            lambda: _capture_samples(files, class_names, pseudo_label_threshold, repeat), output_signature=signature
+        )
+        # 캡처 크기(기본 128)가 학습 입력 크기와 다르면 맞춥니다.
+        return ds.map(
+            lambda x, y: (tf.cast(tf.image.resize(x, (img_size, img_size)), tf.uint8), y), num_parallel_calls=AUTOTUNE
+        )
+
+    return subset("training", hard_negative_repeat), subset("validation", 1), class_names
+
+
+def load_training_data(dataset_path, args, img_size):
+    """이미지 폴더(디코딩 캐시)와 캡처 샤드를 합쳐 (train_ds, val_ds, class_names)를 반환합니다.
+
+    dataset_path 자체가 캡처 샤드 폴더이면 샤드만으로 학습합니다.
+    """
+    capture_dirs = list(args.capture_shards)
+    if os.path.isdir(dataset_path) and list_shards(dataset_path):
+        capture_dirs.insert(0, dataset_path)
+        return load_capture_shards(
+            capture_dirs, None, img_size, args.pseudo_label_threshold, args.hard_negative_repeat
+        )
+
+    train_ds, val_ds, class_names = load_cached(dataset_path, args.cache_dir, img_size, args.seed)
+    if capture_dirs:
+        capture_train, capture_val, _ = load_capture_shards(
+            capture_dirs, class_names, img_size, args.pseudo_label_threshold, args.hard_negative_repeat
+        )
+        train_ds = train_ds.concatenate(capture_train)
+        val_ds = val_ds.concatenate(capture_val)
+    return train_ds, val_ds, class_names
+
+
+# ------------------------------------------
+# 📌 입력 파이프라인
+# ------------------------------------------
+def make_pipelines(train_ds, val_ds, batch_size, seed):
+    data_augmentation = tf.keras.Sequential(
+        [
+            tf.keras.layers.RandomFlip("horizontal", seed=seed),
+            tf.keras.layers.RandomRotation(0.2, seed=seed),
+            tf.keras.layers.RandomZoom(0.2, seed=seed),
+            tf.keras.layers.RandomContrast(0.3, seed=seed),
+            tf.keras.layers.RandomBrightness(0.3, seed=seed),
+        ]
+    )
+
+    def augment(x, y):
+        x = data_augmentation(tf.cast(x, tf.float32), training=True)
+        return x / 255.0, y
+
+    def normalize(x, y):
+        return tf.cast(x, tf.float32) / 255.0, y
+
+    # 캐시된 uint8 텐서를 메모리에 올려 두고, 증강만 매 epoch 새로 적용합니다.
+    train = (
+        train_ds.cache()
+        .shuffle(2048, seed=seed, reshuffle_each_iteration=True)
+        .batch(batch_size)
+        .map(augment, num_parallel_calls=AUTOTUNE)
+        .prefetch(AUTOTUNE)
+    )
+    val = val_ds.cache().batch(batch_size).map(normalize, num_parallel_calls=AUTOTUNE).prefetch(AUTOTUNE)
+    return train, val
+
+
+def extract_zip(zip_path, cache_dir):
+    extract_path = os.path.join(cache_dir, "extracted", os.path.splitext(os.path.basename(zip_path))[0])
+    if not os.path.exists(extract_path):
+        with zipfile.ZipFile(zip_path, "r") as zip_ref:
+            zip_ref.extractall(extract_path)
+        print("압축 해제 완료:", os.listdir(extract_path))
+    nested = os.path.join(extract_path, "train_set")
+    return nested if os.path.isdir(nested) else extract_path
+
+
+def train(model, base_model, train_ds, val_ds, args):
+    """1단계: MobileNetV2 고정 / 2단계: 상위 블록을 풀고 낮은 학습률로 미세 조정."""
+    callbacks = [
+        EarlyStopping(monitor="val_loss", patience=10, restore_best_weights=True),
+        ReduceLROnPlateau(monitor="val_loss", factor=0.5, patience=4, verbose=1, min_lr=1e-6),
+    ]
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=args.lr),
+        loss="categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    model.fit(train_ds, validation_data=val_ds, epochs=args.epochs, callbacks=callbacks)
+
+    if args.fine_tune_epochs > 0:
+        print(f"🔓 미세 조정: MobileNetV2 상위 {args.fine_tune_layers}개 층 학습")
+        unfreeze_top(base_model, args.fine_tune_layers)
+        model.compile(
+            optimizer=tf.keras.optimizers.Adam(learning_rate=args.fine_tune_lr),
+            loss="categorical_crossentropy",
+            metrics=["accuracy"],
+        )
+        model.fit(train_ds, validation_data=val_ds, epochs=args.fine_tune_epochs, callbacks=callbacks)
+
+    _, val_acc = model.evaluate(val_ds, verbose=0)
+    return val_acc
+
+
+def add_common_args(parser):
+    parser.add_argument("dataset", help="train_set 폴더, 데이터셋 zip 파일 또는 캡처 샤드 폴더")
+    parser.add_argument("--cache-dir", default=".train_cache")
+    parser.add_argument("--img-size", type=int, default=128)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--lr", type=float, default=1e-3)
+    parser.add_argument("--fine-tune-epochs", type=int, default=10, help="0이면 미세 조정 생략")
+    parser.add_argument("--fine-tune-layers", type=int, default=30)
+    parser.add_argument("--fine-tune-lr", type=float, default=1e-5)
+    parser.add_argument("--mixed-precision", action="store_true", help="mixed_float16 사용 (GPU/최신 CPU)")
+    parser.add_argument("--seed", type=int, default=123)
+    parser.add_argument("--deterministic", action="store_true", help="연산 결정성 강제 (느려질 수 있음)")
+    parser.add_argument(
+        "--capture-shards", action="append", default=[], metavar="DIR",
+        help="함께 학습할 캡처 샤드 폴더 (GESTURE_CAPTURE_DIR, 여러 번 지정 가능)",
+    )
+    parser.add_argument(
+        "--pseudo-label-threshold", type=float, default=None,
+        help="라벨 없는 캡처 샘플은 확률이 이 값 이상일 때 예측을 라벨로 사용 (생략 시 라벨 없는 샘플 제외)",
+    )
+    parser.add_argument("--hard-negative-repeat", type=int, default=2, help="라벨 있는 어려운 샘플 반복 횟수")
+
+
+def setup(args):
+    """시드/정밀도 설정 후 데이터셋 경로를 반환합니다."""
+    tf.keras.utils.set_random_seed(args.seed)
+    if args.deterministic:
+        tf.config.experimental.enable_op_determinism()
+    if args.mixed_precision:
+        tf.keras.mixed_precision.set_global_policy("mixed_float16")
+    os.makedirs(args.cache_dir, exist_ok=True)
+    if args.dataset.endswith(".zip"):
+        return extract_zip(args.dataset, args.cache_dir)
+    return args.dataset
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="제스처 분류 모델 학습 (로컬 CLI)")
+    add_common_args(parser)
+    parser.add_argument("--output", default="hand_model.h5")
+    args = parser.parse_args()
+
+    dataset_path = setup(args)
+    train_ds, val_ds, class_names = load_training_data(dataset_path, args, args.img_size)
+    print("클래스:", class_names)
+    train_ds, val_ds = make_pipelines(train_ds, val_ds, args.batch_size, args.seed)
+
+    model, base_model = build_model(len(class_names), args.img_size)
+    val_acc = train(model, base_model, train_ds, val_ds, args)
+
+    model.save(args.output)
+    print(f"✅ 저장 완료: {args.output} (검증 정확도 {val_acc:.3f})")
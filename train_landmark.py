@@ -0,0 +1,122 @@
+import argparse
+import os
+
+import cv2
+import numpy as np
+
+from landmark_classifier import FEATURE_SIZE, LandmarkMLP, landmarks_to_array, landmarks_to_features
+
+
+# ------------------------------------------
+# 📌 이미지 데이터셋 → 랜드마크 특징 추출
+# ------------------------------------------
+def extract_features(dataset_path):
+    """train_set/<클래스>/*.jpg 구조에서 MediaPipe 랜드마크 특징을 추출합니다."""
+    import mediapipe as mp
+
+    class_names = sorted(
+        d for d in os.listdir(dataset_path) if os.path.isdir(os.path.join(dataset_path, d))
+    )
+    features, labels = [], []
+    with mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1, min_detection_confidence=0.5) as hands:
+        for label, name in enumerate(class_names):
+            class_dir = os.path.join(dataset_path, name)
+            found = 0
+            for fname in sorted(os.listdir(class_dir)):
+                img = cv2.imread(os.path.join(class_dir, fname))
+                if img is None:
+                    continue
+                results = hands.process(cv2.cvtColor(img, cv2.COLOR_BGR2RGB))
+                if not results.multi_hand_landmarks:
+                    continue
+                points = landmarks_to_array(results.multi_hand_landmarks[0])
+                features.append(landmarks_to_features(points, img.shape[1], img.shape[0]))
+                labels.append(label)
+                found += 1
+            print(f"📂 {name}: 랜드마크 {found}개 추출")
+    return np.array(features, dtype=np.float32), np.array(labels), class_names
+
+
+# ------------------------------------------
+# 📌 NumPy MLP 학습 (Adam + 미니배치)
+# ------------------------------------------
+def train_mlp(x_train, y_train, x_val, y_val, class_names, hidden=64, epochs=300, lr=1e-3, batch_size=64, seed=123):
+    rng = np.random.default_rng(seed)
+    num_classes = len(class_names)
+    mean = x_train.mean(axis=0)
+    std = x_train.std(axis=0) + 1e-6
+    xt = (x_train - mean) / std
+    xv = (x_val - mean) / std
+
+    params = {
+        "w1": rng.normal(0, np.sqrt(2.0 / FEATURE_SIZE), (FEATURE_SIZE, hidden)).astype(np.float32),
+        "b1": np.zeros(hidden, np.float32),
+        "w2": rng.normal(0, np.sqrt(2.0 / hidden), (hidden, num_classes)).astype(np.float32),
+        "b2": np.zeros(num_classes, np.float32),
+    }
+    m = {k: np.zeros_like(v) for k, v in params.items()}
+    v = {k: np.zeros_like(v) for k, v in params.items()}
+    beta1, beta2, step = 0.9, 0.999, 0
+
+    def forward(x):
+        h = np.maximum(x @ params["w1"] + params["b1"], 0.0)
+        logits = h @ params["w2"] + params["b2"]
+        logits -= logits.max(axis=1, keepdims=True)
+        p = np.exp(logits)
+        return h, p / p.sum(axis=1, keepdims=True)
+
+    best_acc, best_params = -1.0, None
+    for epoch in range(epochs):
+        order = rng.permutation(len(xt))
+        for start in range(0, len(order), batch_size):
+            idx = order[start:start + batch_size]
+            x, y = xt[idx], y_train[idx]
+            h, p = forward(x)
+            # softmax + cross-entropy 역전파
+            d_logits = p
+            d_logits[np.arange(len(y)), y] -= 1.0
+            d_logits /= len(y)
+            d_h = (d_logits @ params["w2"].T) * (h > 0)
+            grads = {
+                "w2": h.T @ d_logits, "b2": d_logits.sum(axis=0),
+                "w1": x.T @ d_h, "b1": d_h.sum(axis=0),
+            }
+            step += 1
+            for k in params:
+                m[k] = beta1 * m[k] + (1 - beta1) * grads[k]
+                v[k] = beta2 * v[k] + (1 - beta2) * grads[k] ** 2
+                m_hat = m[k] / (1 - beta1 ** step)
+                v_hat = v[k] / (1 - beta2 ** step)
+                params[k] -= (lr * m_hat / (np.sqrt(v_hat) + 1e-8)).astype(np.float32)
+
+        val_acc = float((forward(xv)[1].argmax(axis=1) == y_val).mean())
+        if val_acc > best_acc:
+            best_acc, best_params = val_acc, {k: p.copy() for k, p in params.items()}
+        if (epoch + 1) % 50 == 0:
+            print(f"epoch {epoch + 1}: val_acc={val_acc:.3f} (best {best_acc:.3f})")
+
+    return LandmarkMLP(mean=mean, std=std, class_names=class_names, **best_params), best_acc
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="랜드마크 기반 제스처 MLP 학습")
+    parser.add_argument("dataset_path", help="train_set 폴더 (클래스별 하위 폴더)")
+    parser.add_argument("--output", default="hand_landmark_mlp.npz")
+    parser.add_argument("--hidden", type=int, default=64)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=123)
+    args = parser.parse_args()
+
+    features, labels, class_names = extract_features(args.dataset_path)
+
+    # 8:2 학습/검증 분할
+    order = np.random.default_rng(args.seed).permutation(len(features))
+    split = int(len(order) * 0.8)
+    train_idx, val_idx = order[:split], order[split:]
+
+    model, val_acc = train_mlp(
+        features[train_idx], labels[train_idx], features[val_idx], labels[val_idx],
+        class_names, hidden=args.hidden, epochs=args.epochs, seed=args.seed,
+    )
+    model.save(args.output)
+    print(f"✅ 저장 완료: {args.output} (검증 정확도 {val_acc:.3f})")
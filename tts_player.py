@@ -0,0 +1,168 @@
+import hashlib
+import os
+import queue
+import subprocess
+import threading
+import time
+
+import metrics
+
+SYNTHESIS_LATENCY = metrics.histogram("tts_synthesis_seconds", "gTTS 합성 시간")
+CACHE_LOOKUPS = metrics.counter("tts_cache_lookups_total", "TTS 캐시 조회 수", ["result"])
+PLAYBACK_LATENCY = metrics.histogram("tts_playback_seconds", "재생 요청부터 재생 완료까지의 시간")
+QUEUE_WAIT = metrics.histogram("tts_queue_wait_seconds", "재생 대기열에서 기다린 시간")
+
+
+# --- 내용 기반 TTS 캐시 ---
+class TTSCache:
+    """문장을 해시한 파일명으로 gTTS 결과를 디스크에 저장해 재사용합니다.
+
+    같은 문장은 한 번만 합성하며, 전체 크기가 max_bytes를 넘으면
+    가장 오래 사용하지 않은(mtime 기준) 파일부터 지웁니다.
+    """
+
+    def __init__(self, cache_dir="tts_cache", lang="ko", max_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.lang = lang
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._inflight = {}  # 합성 중인 파일 경로 → 완료 시 set되는 Event
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path_for(self, text):
+        key = hashlib.sha1(f"{self.lang}:{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def get(self, text):
+        """text의 mp3 경로를 반환합니다. 캐시에 없으면 gTTS로 합성합니다.
+
+        합성(네트워크 요청)은 전역 잠금 밖에서 하므로 다른 문장의 캐시 조회를 막지 않습니다.
+        같은 문장을 동시에 요청하면 한 스레드만 합성하고 나머지는 그 결과를 기다립니다.
+        """
+        path = self.path_for(text)
+        while True:
+            with self._lock:
+                if os.path.exists(path):
+                    os.utime(path)  # LRU 갱신
+                    CACHE_LOOKUPS.inc(result="hit")
+                    return path
+                pending = self._inflight.get(path)
+                if pending is None:
+                    pending = self._inflight[path] = threading.Event()
+                    break
+            # 다른 스레드가 합성 중이면 끝날 때까지 기다렸다가 다시 확인합니다. (실패했으면 이 스레드가 다시 합성)
+            pending.wait()
+
+        CACHE_LOOKUPS.inc(result="miss")
+        try:
+            from gtts import gTTS
+
+            # 재생 중인 파일과 겹치지 않도록 임시 파일에 쓴 뒤 원자적으로 교체합니다.
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with SYNTHESIS_LATENCY.time():
+                gTTS(text=text, lang=self.lang).save(tmp_path)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._evict()
+        finally:
+            with self._lock:
+                del self._inflight[path]
+            pending.set()
+        return path
+
+    def prerender(self, texts):
+        for text in texts:
+            try:
+                self.get(text)
+            except Exception as e:
+                print(f"❌ TTS 사전 생성 실패 ({text}):", e)
+
+    def _evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".mp3"):
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+
+# --- 상주형 오디오 플레이어 ---
+class AudioPlayer:
+    """mpg123 프로세스 하나를 원격 제어 모드(-R)로 띄워 두고 큐에 들어온 순서대로 재생합니다.
+
+    재생 요청마다 새 프로세스를 만들지 않으며, enqueue()는 바로 반환합니다.
+    resolve는 큐 항목(파일 경로 또는 문장)을 재생할 mp3 경로로 바꾸는 함수입니다.
+    """
+
+    def __init__(self, resolve, queue_size=8, playback_timeout=30.0):
+        self.resolve = resolve
+        self.playback_timeout = playback_timeout
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._finished = threading.Event()
+        self._error = None  # 재생 중 mpg123이 보고한 오류 줄 (@E)
+        self._proc = None
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def enqueue(self, item):
+        try:
+            self._queue.put_nowait((item, time.perf_counter()))
+        except queue.Full:
+            print("⚠️ 재생 대기열이 가득 차 요청을 건너뜁니다:", item)
+
+    def _ensure_process(self):
+        if self._proc is not None and self._proc.poll() is None:
+            return
+        self._proc = subprocess.Popen(
+            ["mpg123", "-R"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        threading.Thread(target=self._read_status, args=(self._proc,), daemon=True).start()
+
+    def _read_status(self, proc):
+        # "@P 0"은 재생이 끝나(또는 멈춰) 다음 파일을 받을 수 있다는 뜻입니다.
+        # "@E"는 파일을 열거나 디코딩하지 못했다는 뜻으로, @P 0 없이 끝날 수 있으므로 재생 종료로 봅니다.
+        for line in proc.stdout:
+            if line.startswith("@P 0"):
+                self._finished.set()
+            elif line.startswith("@E"):
+                self._error = line[2:].strip()
+                self._finished.set()
+
+    def _worker(self):
+        while True:
+            item, enqueued_at = self._queue.get()
+            QUEUE_WAIT.observe(time.perf_counter() - enqueued_at)
+            try:
+                path = self.resolve(item)
+                self._ensure_process()
+                self._finished.clear()
+                self._error = None
+                start = time.perf_counter()
+                self._proc.stdin.write(f"LOAD {os.path.abspath(path)}\n")
+                self._proc.stdin.flush()
+                if not self._finished.wait(self.playback_timeout):
+                    print("⚠️ 재생 완료 신호가 없어 다음 항목으로 넘어갑니다:", path)
+                elif self._error is not None:
+                    print(f"❌ mpg123 재생 오류 ({path}):", self._error)
+                else:
+                    PLAYBACK_LATENCY.observe(time.perf_counter() - start)
+            except Exception as e:
+                print("❌ 음성 재생 실패:", e)
+                if self._proc is not None and self._proc.poll() is None:
+                    self._proc.kill()
+                self._proc = None
+
+    def close(self):
+        if self._proc is not None and self._proc.poll() is None:
+            self._proc.stdin.write("QUIT\n")
+            self._proc.stdin.flush()
+            self._proc.wait(timeout=2)